@@ -41,16 +41,171 @@ with.
 """
 import warnings
 from bisect import bisect_right
+from functools import reduce
 from os.path import splitext
 
 import numpy as np
-from scipy import interpolate, linalg
+from scipy import ndimage
 
 from kuibit import grid_data_utils as gdu
 from kuibit.numerical import BaseNumerical
 from kuibit.series import BaseSeries
 from kuibit.uniform_grid import UniformGrid
 
+# numba is optional. When it is available, we use it to compute derivatives of
+# large arrays (see _partial_derivative).
+try:
+    from numba import njit, prange
+except ImportError:  # pragma: no cover
+    prange = range
+
+# Compiled version of _first_derivative_kernel, created the first time it is
+# needed
+_first_derivative_kernel_numba = None
+
+
+def _first_derivative_kernel(data, dx, out):
+    """Write in ``out`` the first derivative of the 3D array ``data`` along its
+    second axis.
+
+    This is the same as ``np.gradient(data, dx, axis=1, edge_order=2)``
+    (second order centered differences in the interior, second order one-sided
+    at the boundaries), but written as explicit loops, so that it can be
+    compiled with numba. The data is traversed only once and without
+    temporary arrays. The operations are the same as in NumPy, so the result
+    is the same up to roundoff.
+
+    This function is not meant to be called directly.
+
+    :param data: Data to differentiate. The second axis is the one along which
+                 the derivative is taken, the other two are all the axes
+                 before and after that one, flattened.
+    :type data: 3D NumPy array
+    :param dx: Grid spacing along the direction of the derivative.
+    :type dx: float
+    :param out: Array with the same shape as ``data`` to write the output.
+    :type out: 3D NumPy array
+
+    """
+    num_outer, num_points, num_inner = data.shape
+    last = num_points - 1
+    # Coefficients of the one-sided derivatives at the boundaries
+    a_first, b_first, c_first = -1.5 / dx, 2.0 / dx, -0.5 / dx
+    a_last, b_last, c_last = 0.5 / dx, -2.0 / dx, 1.5 / dx
+    two_dx = 2.0 * dx
+
+    for i in prange(num_outer):
+        for k in range(num_inner):
+            out[i, 0, k] = (
+                a_first * data[i, 0, k]
+                + b_first * data[i, 1, k]
+                + c_first * data[i, 2, k]
+            )
+        for j in range(1, last):
+            for k in range(num_inner):
+                out[i, j, k] = (data[i, j + 1, k] - data[i, j - 1, k]) / two_dx
+        for k in range(num_inner):
+            out[i, last, k] = (
+                a_last * data[i, last - 2, k]
+                + b_last * data[i, last - 1, k]
+                + c_last * data[i, last, k]
+            )
+
+
+def _partial_derivative(data, dx, axis, order=1, force_numba=False):
+    """Return the ``order``-th numerical derivative of ``data`` along ``axis``.
+
+    This is equivalent to applying ``np.gradient`` with ``edge_order=2``
+    ``order`` times. When numba is available and the array is large, this is
+    done with a compiled kernel (:py:func:`~._first_derivative_kernel`). For
+    smaller arrays, the time needed to compile the kernel is larger than the
+    time saved, so we use NumPy, unless ``force_numba`` is True.
+
+    This function is not meant to be called directly.
+
+    :param data: Data to differentiate.
+    :type data: NumPy array
+    :param dx: Grid spacing along the direction of the derivative.
+    :type dx: float
+    :param axis: Axis along which to take the derivative.
+    :type axis: int
+    :param order: Number of derivatives.
+    :type order: int
+    :param force_numba: Use numba (if available) regardless of the size of the
+                        array.
+    :type force_numba: bool
+
+    :returns: Derivative of the data.
+    :rtype: NumPy array
+
+    """
+    global _first_derivative_kernel_numba
+
+    # The one-sided derivatives at the boundary need at least three points
+    # (with fewer points, NumPy will raise the appropriate error)
+    use_numba = (
+        "njit" in globals()
+        and (force_numba or data.size >= 10**6)
+        and data.shape[axis] >= 3
+    )
+
+    if force_numba and "njit" not in globals():
+        warnings.warn("numba not available, ignoring force_numba")
+
+    if not use_numba or order == 0:
+        ret = data
+        for _num_deriv in range(order):
+            ret = np.gradient(ret, dx, axis=axis, edge_order=2)
+        return ret
+
+    if _first_derivative_kernel_numba is None:
+        _first_derivative_kernel_numba = njit(cache=True, parallel=True)(
+            _first_derivative_kernel
+        )
+
+    # As NumPy, we differentiate integers as floats
+    if not np.issubdtype(data.dtype, np.inexact):
+        data = data.astype(np.float64)
+
+    # We view the data as a 3D array, with the axis of the derivative in the
+    # middle. This does not copy the data when it is contiguous.
+    shape_3d = (
+        int(np.prod(data.shape[:axis])),
+        data.shape[axis],
+        int(np.prod(data.shape[axis + 1 :])),
+    )
+    data_3d = np.ascontiguousarray(data).reshape(shape_3d)
+
+    # For higher derivatives, we alternate between two buffers, so that we
+    # never need more than two arrays
+    buffers = [np.empty_like(data_3d), np.empty_like(data_3d)]
+    for num_deriv in range(order):
+        _first_derivative_kernel_numba(data_3d, dx, buffers[num_deriv % 2])
+        data_3d = buffers[num_deriv % 2]
+
+    return data_3d.reshape(data.shape)
+
+
+def _float_parts(data):
+    """Return the real and imaginary parts of ``data`` as arrays of floats.
+
+    This is the input needed by ``scipy.ndimage.map_coordinates``. For float
+    and complex data, no copy is made. Other types (e.g., integers) are
+    converted.
+
+    :param data: Array.
+    :type data: NumPy array
+
+    :returns: Real and imaginary part of the data (None for real data).
+    :rtype: tuple of NumPy arrays (the second can be None)
+    """
+    if np.iscomplexobj(data):
+        return (
+            data.real.astype(float, copy=False),
+            data.imag.astype(float, copy=False),
+        )
+    return data.astype(float, copy=False), None
+
 
 class GridSeries(BaseSeries):
     """One-dimensional grid data, handled with the Series infrastructure.
@@ -92,22 +247,14 @@ class UniformGridData(BaseNumerical):
 
     A :py:class:`~.UniformGridData` can be initialized with the default
     constructor (which takes grid and data), of with the alternative constructor
-    :py:meth:`~.from_grid_structure` (which takes grid details and data).
+    :py:meth:`~.from_grid_structure` (which takes grid details and data). Data
+    from separable functions can be sampled with :py:meth:`~.from_separable`.
 
     :ivar grid: Uniform grid over which the data is defined.
     :type grid: :py:class:`~.UniformGrid`
     :ivar data: The actual data.
     :type data: NumPy array.
 
-    :ivar invalid_spline: Whether the spline stored is valid.
-    :type invalid_spline: bool
-
-    :ivar spline_real: Spline representation of the real part of the data.
-    :type spline_real: SciPy's RegularGridInterpolator, or None
-
-    :ivar spline_imag: Spline representation of the imaginary part of the data.
-    :type spline_imag: SciPy's RegularGridInterpolator, or None
-
     """
 
     # We are deriving this from BaseNumerical. This will give all the
@@ -132,16 +279,6 @@ class UniformGridData(BaseNumerical):
         self.grid = grid.copy()
         self.data = data.copy()
 
-        # We keep this flag around to know when we have to recompute the
-        # splines
-        self.invalid_spline = True
-        # Here we also define the splines as empty objects so that we know that
-        # they are attributes of the class and they are not uninitialized.
-        # These attributes will store data relevant for evaluating the spline.
-        # This will be an object of type SciPy's RegularGridInterpolator.
-        self.spline_real = None
-        self.spline_imag = None
-
     # This is a class method. It doesn't depend on the specific instance, and
     # it is used as an alternative constructor.
     @classmethod
@@ -192,6 +329,87 @@ class UniformGridData(BaseNumerical):
         )
         return cls(geom, data)
 
+    @classmethod
+    def from_separable(cls, grid, functions):
+        """Sample a separable function on ``grid``.
+
+        A separable function is a function that can be written as product of
+        functions of one variable, ``f(x, y, ...) = f0(x) * f1(y) * ...``.
+        Each of these functions is evaluated only on the 1D coordinates along
+        its direction, and the data is obtained with an outer product. This
+        requires much fewer function evaluations than sampling ``f`` on every
+        point of the grid.
+
+        :param grid: Uniform grid over which the data is defined.
+        :type grid: :py:class:`~.UniformGrid`
+        :param functions: Functions of one variable, one for each dimension.
+        :type functions: list of callables
+
+        :returns: Sampled data.
+        :rtype: :py:class:`~.UniformGridData`
+
+        """
+        if not isinstance(grid, UniformGrid):
+            raise TypeError("grid has to be a UniformGrid")
+
+        if len(functions) != grid.num_dimensions:
+            raise ValueError(
+                f"Number of functions ({len(functions)}) and dimensions "
+                f"of the grid ({grid.num_dimensions}) differ"
+            )
+
+        # We broadcast the output of each function to the 1D coordinates, so
+        # that we can work with functions that return a constant
+        factors = [
+            np.broadcast_to(np.asarray(func(coord)), coord.shape)
+            for func, coord in zip(functions, grid.coordinates_1d)
+        ]
+
+        return cls(grid, reduce(np.multiply.outer, factors))
+
+    @classmethod
+    def _from_buffer(cls, grid, data, inputs=()):
+        """Create a :py:class:`~.UniformGridData` without copying ``grid`` and
+        ``data``, when this is safe.
+
+        The default constructor copies the data, so that the new object does not
+        share memory with anything else. When ``data`` is a new array (e.g., the
+        output of a ufunc), nobody else can modify it, so we can use it
+        directly. This saves one copy in every mathematical operation. If
+        ``data`` (or its mask) may share memory with any of the ``inputs`` of
+        the operation, we fall back to the default constructor.
+
+        This function is not meant to be called directly.
+
+        :param grid: Uniform grid over which the data is defined.
+        :type grid: :py:class:`~.UniformGrid`
+        :param data: The data.
+        :type data: A NumPy array.
+        :param inputs: Arrays used to compute ``data``.
+        :type inputs: list of NumPy arrays or scalars
+
+        :returns: New object with the given grid and data.
+        :rtype: :py:class:`~.UniformGridData`
+        """
+        if not (
+            isinstance(data, np.ndarray)
+            and data.shape == tuple(grid.shape)
+            and not any(
+                # Ufuncs on masked arrays can reuse the mask of the input, so
+                # we also check the masks
+                np.may_share_memory(data, inp)
+                or np.may_share_memory(np.ma.getmask(data), np.ma.getmask(inp))
+                for inp in inputs
+            )
+        ):
+            return cls(grid, data)
+
+        ret = cls.__new__(cls)
+        # UniformGrid is immutable, so we do not need to copy it
+        ret.grid = grid
+        ret.data = data
+        return ret
+
     def coordinates(self):
         """Return coordinates of the grid points as list of
         :py:class:`~.UniformGridData`.
@@ -207,7 +425,9 @@ class UniformGridData(BaseNumerical):
             for coord in self.coordinates_from_grid(as_same_shape=True)
         ]
 
-    def coordinates_from_grid(self, as_meshgrid=False, as_same_shape=False):
+    def coordinates_from_grid(
+        self, as_meshgrid=False, as_same_shape=False, sparse=False
+    ):
         """Return coordinates of the grid points.
 
         This is equivalent to ``self.grid.coordinates()``.
@@ -221,6 +441,11 @@ class UniformGridData(BaseNumerical):
         same shape of self and with values the coordinates. This is useful for
         computations involving the coordinates.
 
+        If ``sparse`` is True (and one between ``as_meshgrid`` and
+        ``as_same_shape`` is True), the arrays returned only extend along the
+        direction of the coordinate they represent and broadcast to the full
+        ones.
+
         :param as_meshgrid: If True, return the coordinates as meshgrid.
         :type as_meshgrid: bool
         :param as_same_shape: If True, return the coordinates as a list
@@ -229,12 +454,15 @@ class UniformGridData(BaseNumerical):
                               For instance, if ``self.num_dimension = 3`` there
                               will be three lists with ``shape = self.shape``.
         :type as_same_shape: bool
+        :param sparse: If True, return arrays that broadcast to the full shape
+                       instead of the full arrays.
+        :type sparse: bool
         :returns:  Grid coordinates.
         :rtype:   list of NumPy arrays with the same shape as grid
 
         """
         return self.grid.coordinates(
-            as_meshgrid=as_meshgrid, as_same_shape=as_same_shape
+            as_meshgrid=as_meshgrid, as_same_shape=as_same_shape, sparse=sparse
         )
 
     def coordinates_meshgrid(self):
@@ -438,75 +666,45 @@ class UniformGridData(BaseNumerical):
     def __getitem__(self, key):
         return self.data[key]
 
-    def _make_spline(self, k=1):
-        """Private function to make spline representation of the data using
-        ``scipy.interpolate.RegularGridInterpolator``.
+    def _multilinear_interpolation(self, indices):
+        """Return the data interpolated with multilinear interpolation on the
+        given (fractional) indices.
 
-        Only nearest neighbor or multilinear interpolations are available.
+        Since the grid is uniform, we can directly compute where each point
+        falls in the data, and we do not need to build a spline. Our grid is
+        cell-centered, so it is perfectly valid to evaluate a point that is
+        outside the grid points, as long as it is within 0.5 * dx. There, we
+        take the value of the closest point (which is equivalent to a 0th order
+        interpolation at the very last half cell). This is what
+        ``mode="nearest"`` does in ``scipy.ndimage.map_coordinates``.
 
-        Computing spline is memory intenstive: 150 MB/million points.
+        This function does not check that the points are within the grid and
+        is not meant to be called directly.
 
-        This function is not meant to be called directly.
+        :param indices: Fractional indices of the points. The first axis runs
+                        over the dimensions.
+        :type indices: NumPy array or list of NumPy arrays
 
-        :param k: Order of the interpolation (k = 0 or 1).
-        :type k:  int
+        :returns: Values of the data evaluated on the given indices.
+        :rtype:   NumPy array with the shape of the indices of one dimension
 
         """
-
         if self.is_masked():
-            raise RuntimeError("Splines with masked data are not supported.")
-
-        coords = self.grid.coordinates()
-
-        if k not in (0, 1):
-            raise ValueError(
-                "Order for splines for dimensions > 2 must be 0 or 1"
+            raise RuntimeError(
+                "Interpolation with masked data is not supported."
             )
 
-        # Here k is 0 or 1
-        method = "nearest" if k == 0 else "linear"
-
-        # Our grid is cell-centered, so it is perfecly valid to evaluate a point
-        # that it is outside coords, as long as it is within 0.5 * dx. For
-        # example, if the grid is linear from 0 to 10 with dx = 1, the pint
-        # -0.25 is in the grid. To account for this in splines (to avoid that
-        # they throw an error), we add another point at the two boundaries. This
-        # point as the same value as the last point (which is equivalent to a
-        # 0th order interpolation at the very last half cell).
-
-        # With this, the grid has uneven spacing.
-        # Add an element at the beginning and end
-        for index, coord in enumerate(coords):
-            coords[index] = np.concatenate(
-                (
-                    [coord[0] - 0.5 * self.dx[index]],
-                    coord,
-                    [coord[-1] + 0.5 * self.dx[index]],
-                )
+        def interpolate_real(data):
+            return ndimage.map_coordinates(
+                data, indices, order=1, mode="nearest"
             )
 
-        # Add the border
-        data_real = np.pad(self.data.real, pad_width=1, mode="edge")
-
-        self.spline_real = interpolate.RegularGridInterpolator(
-            coords,
-            data_real,
-            method=method,
-            fill_value=0,
-            bounds_error=True,
-        )
-
-        if self.is_complex():
-            data_imag = np.pad(self.data.imag, pad_width=1, mode="edge")
-            self.spline_imag = interpolate.RegularGridInterpolator(
-                coords,
-                data_imag,
-                method=method,
-                fill_value=0,
-                bounds_error=True,
-            )
+        data_real, data_imag = _float_parts(self.data)
 
-        self.invalid_spline = False
+        ret = interpolate_real(data_real)
+        if data_imag is not None:
+            ret = ret + 1j * interpolate_real(data_imag)
+        return ret
 
     def _nearest_neighbor_interpolation(self, points, ext=2):
         """Return data of nearest neighbors of given points x.
@@ -562,9 +760,7 @@ class UniformGridData(BaseNumerical):
 
         # Here we substitute those elements that are outside with the point
         # (0, 0, 0, ...) (N zeros with 0 is num dimension)
-        indices_arr[outside_indices] = np.zeros(
-            self.num_dimensions, dtype=np.int
-        )
+        indices_arr[outside_indices] = np.zeros(self.num_dimensions, dtype=int)
 
         # See comment ~10 lines above for what this means
         take_indices = tuple(zip(*indices_arr))
@@ -574,6 +770,60 @@ class UniformGridData(BaseNumerical):
 
         return ret
 
+    def _multilinear_interpolation_on_grid(self, grid, ext=2):
+        """Return data evaluated on the points of ``grid`` with multilinear
+        interpolation.
+
+        This is equivalent to evaluating the data on the coordinates of
+        ``grid``, but since both the grids are uniform, we can work with the 1D
+        coordinates, without considering each point separately.
+
+        :param grid: Grid where to evaluate the data.
+        :type grid: :py:class:`~.UniformGrid`
+
+        :param ext: How to deal values outside the boundaries. Values outside
+                    the interval are set to 0 if ``ext=1``,
+                    or an error is raised if ``ext=2``.
+        :type ext:  int
+
+        :returns: Values of the data evaluated on the points of ``grid``.
+        :rtype:   NumPy array with the same shape as ``grid``
+
+        """
+        coordinates_1d = grid.coordinates_1d
+
+        # Points that are within half cell from the boundary are in the grid
+        # (see _multilinear_interpolation)
+        outside_1d = [
+            np.logical_or(coord < low, coord > high)
+            for coord, low, high in zip(
+                coordinates_1d,
+                self.grid.lowest_vertex,
+                self.grid.highest_vertex,
+            )
+        ]
+
+        if ext == 2 and any(np.any(outside) for outside in outside_1d):
+            raise ValueError("Point outside the grid")
+
+        # Fractional indices of the new points along each direction
+        indices_1d = [
+            (coord - x0) / dx
+            for coord, x0, dx in zip(coordinates_1d, self.x0, self.dx)
+        ]
+        ret = self._multilinear_interpolation(
+            np.meshgrid(*indices_1d, indexing="ij")
+        )
+
+        if ext == 1:
+            # We set to zero the points that are outside along any direction
+            for dim, outside in enumerate(outside_1d):
+                slicer = [slice(None)] * grid.num_dimensions
+                slicer[dim] = outside
+                ret[tuple(slicer)] = 0
+
+        return ret
+
     def evaluate_with_spline(self, x, ext=2, piecewise_constant=False):
         """Evaluate the spline on the points ``x``.
 
@@ -596,7 +846,7 @@ class UniformGridData(BaseNumerical):
 
         """
         # ext = 0 is extrapolation and ext = 3 is setting the boundary
-        # value. We cannot do this with RegularGridInterpolator
+        # value.
 
         # TODO (FEATURE): Implement ext = 3
         #
@@ -610,6 +860,13 @@ class UniformGridData(BaseNumerical):
                 raise ValueError(
                     "Incompatible dimensions between input and self"
                 )
+            # When we have to evaluate the data on a grid with multilinear
+            # interpolation, we can do that without splines
+            if not piecewise_constant and (
+                self.num_dimensions == self.num_extended_dimensions
+            ):
+                return self._multilinear_interpolation_on_grid(x, ext=ext)
+
             # The way we want the coordinates is like as an array with the same
             # shape of the grid and with values the coordinates (as arrays).
             # This is similar to as_same_shape, but the coordinates have to be
@@ -635,35 +892,29 @@ class UniformGridData(BaseNumerical):
             ret = self._nearest_neighbor_interpolation(x_arr, ext=ext)
 
         else:
-            # We are here only with method = linear
-
-            if self.invalid_spline:
-                self._make_spline()
+            # We are here only with multilinear interpolation
+            if x_arr.shape[-1] != self.num_dimensions:
+                raise ValueError(
+                    "Incompatible dimensions between input and self"
+                )
 
-            # ext = 1 is setting to 0. We set fill_value to 0, so this is the
-            # default behavior. We change the bounds_error attribute in
-            # RegularGridInterpolator that controls this. By default, we set it
-            # to raise an error. We reset it to True when we are done.
-            if ext == 1:
-                self.spline_real.bounds_error = False
-                if self.is_complex():
-                    self.spline_imag.bounds_error = False
+            # Points that are within half cell from the boundary are in the
+            # grid (see _multilinear_interpolation)
+            outside = np.logical_or(
+                np.any(x_arr < self.grid.lowest_vertex, axis=-1),
+                np.any(x_arr > self.grid.highest_vertex, axis=-1),
+            )
 
-            def apply_spline(points):
-                y_real = self.spline_real(points)
-                if self.is_complex():
-                    y_imag = self.spline_imag(points)
-                    ret = y_real + 1j * y_imag
-                else:
-                    ret = y_real
-                return ret
+            if ext == 2 and np.any(outside):
+                raise ValueError("Point outside the grid")
 
-            ret = apply_spline(x_arr)
+            # The first axis of the indices has to run over the dimensions
+            ret = self._multilinear_interpolation(
+                np.transpose((x_arr - self.x0) / self.dx)
+            )
 
             if ext == 1:
-                self.spline_real.bounds_error = True
-                if self.is_complex():
-                    self.spline_imag.bounds_error = True
+                ret[outside] = 0
 
         # Now we have to reconstruct the correct return shape.
         # First, we determine what is the dimensionality of the output
@@ -924,8 +1175,6 @@ class UniformGridData(BaseNumerical):
         """
         ret = f(*args, **kwargs)
         self.grid, self.data = ret.grid, ret.data
-        # We have to recompute the splines
-        self.invalid_spline = True
 
     def flat_dimensions_removed(self):
         """Return a new :py:class:`~.UniformGridData` with dimensions of one grid point
@@ -953,18 +1202,21 @@ class UniformGridData(BaseNumerical):
             return self.copy()
 
         new_grid = self.grid.ghost_zones_removed()
-        # We remove the borders from the data using the slicing operator
+        # We remove the borders from the data using the slicing operator. We
+        # cannot use -ghost_zones as upper bound, because slice(0, -0) would
+        # be empty for the dimensions without ghost zones. The slice is a view,
+        # so the constructor copies the data only once.
         slicer = tuple(
-            [
-                slice(ghost_zones, -ghost_zones)
-                for ghost_zones in self.num_ghost
-            ]
+            slice(ghost_zones, num_points - ghost_zones)
+            for ghost_zones, num_points in zip(self.num_ghost, self.shape)
         )
-        new_data = self.data[slicer]
-        return type(self)(new_grid, new_data)
+        return type(self)(new_grid, self.data[slicer])
 
     def ghost_zones_remove(self):
         """Remove all the ghost zones."""
+        # Nothing to do, so we avoid copying the data
+        if np.amax(self.num_ghost) == 0:
+            return
         self._apply_to_self(self.ghost_zones_removed)
 
     def reflection_symmetry_undone(self, dimension, parity=1):
@@ -1093,7 +1345,7 @@ class UniformGridData(BaseNumerical):
         # And we need to extend the grid too
 
         # Compute the new x0
-        new_x0 = self.x0
+        new_x0 = self.x0.copy()
         new_x0[dimension] = -self.x1[dimension]
 
         new_grid = UniformGrid(
@@ -1211,7 +1463,8 @@ class UniformGridData(BaseNumerical):
 
     def copy(self):
         """Return a deep of self."""
-        return type(self)(self.grid, self.data)
+        # UniformGrid is immutable, so only the data has to be copied
+        return self._from_buffer(self.grid, self.data.copy())
 
     @property
     def num_dimensions(self):
@@ -1270,9 +1523,50 @@ class UniformGridData(BaseNumerical):
         :returns: The norm2 computed as volume-weighted sum.
         :rtype:   float (or complex if data is complex).
         """
-        return linalg.norm(np.ravel(self.data), ord=order) * self.grid.dv ** (
-            1 / order
-        )
+        return self.norms(orders=(order,))[order]
+
+    def norms(self, orders=(1, 2)):
+        r"""Compute the norms of multiple orders over the whole volume of the
+        grid.
+
+        :math:`\|u\|_p = (\sum \|u\|^p dv)^1/p`
+
+        For ``np.inf`` (``-np.inf``), the norm is the maximum (minimum) of the
+        absolute value of the data.
+
+        This is faster than calling :py:meth:`~.norm_p` multiple times because
+        the absolute value of the data is computed only once, and the powers
+        are all written in the same array.
+
+        :param orders: Orders of the norms.
+        :type orders: list of int
+
+        :returns: Dictionary with the orders as keys and the norms (computed as
+                  volume-weighted sums) as values.
+        :rtype:   dict
+        """
+        abs_data = np.abs(np.asarray(self.data))
+        dv = self.grid.dv
+
+        buffer = None
+        ret = {}
+        for order in orders:
+            # As in linalg.norm, the infinite norms are the maximum and the
+            # minimum of the absolute value (dv ** 0 == 1)
+            if order == np.inf:
+                ret[order] = abs_data.max()
+                continue
+            if order == -np.inf:
+                ret[order] = abs_data.min()
+                continue
+            if order == 1:
+                abs_data_p = abs_data
+            else:
+                if buffer is None:
+                    buffer = np.empty_like(abs_data)
+                abs_data_p = np.power(abs_data, order, out=buffer)
+            ret[order] = (abs_data_p.sum() * dv) ** (1 / order)
+        return ret
 
     def norm2(self):
         r"""Compute the norm over the whole volume of the grid.
@@ -1294,6 +1588,22 @@ class UniformGridData(BaseNumerical):
         """
         return self.norm_p(order=1)
 
+    def abs_min(self):
+        """Return the minimum of the absolute value"""
+        return np.min(np.abs(self.data))
+
+    def abs_max(self):
+        """Return the maximum of the absolute value"""
+        return np.max(np.abs(self.data))
+
+    def abs_nanmin(self):
+        """Return the minimum of the absolute value ignoring NaNs"""
+        return np.nanmin(np.abs(self.data))
+
+    def abs_nanmax(self):
+        """Return the maximum of the absolute value ignoring NaNs"""
+        return np.nanmax(np.abs(self.data))
+
     def histogram(
         self,
         weights=None,
@@ -1487,13 +1797,15 @@ class UniformGridData(BaseNumerical):
                 f"{direction} is not available"
             )
 
-        ret_value = self.data.copy()
-        for _num_deriv in range(order):
-
-            ret_value = np.gradient(
-                ret_value, self.dx[direction], axis=direction, edge_order=2
-            )
-        return type(self)(self.grid, ret_value)
+        # The derivative is a new array, so we do not need to copy it (unless
+        # order is 0)
+        return self._from_buffer(
+            self.grid,
+            _partial_derivative(
+                self.data, self.dx[direction], direction, order=order
+            ),
+            inputs=(self.data,),
+        )
 
     def gradient(self, order=1):
         """Return a list :py:class:`~.UniformGridData` that are the numerical
@@ -1597,7 +1909,11 @@ class UniformGridData(BaseNumerical):
         :rtype:    :py:class:`~.UniformGridData`
 
         """
-        return type(self)(self.grid, function(self.data, *args, **kwargs))
+        return self._from_buffer(
+            self.grid,
+            function(self.data, *args, **kwargs),
+            inputs=(self.data,),
+        )
 
     def _apply_reduction(self, reduction, *args, **kwargs):
         """Apply a reduction to the data.
@@ -1628,30 +1944,97 @@ class UniformGridData(BaseNumerical):
         :returns:  Return value of function when called with ``self`` and ``other``.
         :rtype:    :py:class:`~.UniformGridData`
 
+        """
+        other_data = self._data_of_operand(other)
+        return self._from_buffer(
+            self.grid,
+            function(self.data, other_data, *args, **kwargs),
+            inputs=(self.data, other_data),
+        )
+
+    def _data_of_operand(self, other):
+        """Return the data of ``other`` to be used in a binary operation with
+        ``self``.
+
+        :param other: Other object.
+        :type other: :py:class:`~.UniformGridData` or scalar
+
+        :returns: Data of ``other`` (or ``other`` itself if it is a number).
+        :rtype: NumPy array or scalar
+
         """
         # If the other object is of the same type
         if isinstance(other, type(self)):
             # Check the the coordinates are the same by checking shape, origin
-            # and dx
-            if not (
+            # and dx. First, we check if the grids are bitwise identical
+            # (which is the most common case), then up to numerical precision.
+            if self.grid._key[:3] != other.grid._key[:3] and not (
                 all(self.grid.shape == other.grid.shape)
                 and np.allclose(self.grid.x0, other.grid.x0, atol=1e-14)
                 and np.allclose(self.grid.dx, other.grid.dx, atol=1e-14)
             ):
                 raise ValueError("The objects do not have the same grid!")
-            return type(self)(
-                self.grid, function(self.data, other.data, *args, **kwargs)
-            )
+            return other.data
 
         # If it is a number
         if isinstance(other, (int, float, complex)):
-            return type(self)(
-                self.grid, function(self.data, other, *args, **kwargs)
-            )
+            return other
 
         # If we are here, it is because we cannot add the two objects
         raise TypeError("I don't know how to combine these objects")
 
+    def _apply_binary_in_place(self, other, function):
+        """Apply the ufunc ``function`` to ``self`` and ``other``, writing the
+        result in the data of ``self`` when possible.
+
+        This is used to implement the in-place operators (e.g., ``+=``)
+        without allocating new arrays. When the result cannot be stored in
+        the data (e.g., because it has a different type), a new object is
+        returned instead.
+
+        :param other: Other object.
+        :type other: :py:class:`~.UniformGridData` or scalar
+        :param function: NumPy ufunc with two inputs.
+        :type function: callable
+
+        :returns: ``self`` or new object with the result.
+        :rtype: :py:class:`~.UniformGridData`
+
+        """
+        other_data = self._data_of_operand(other)
+
+        # Masked arrays need special treatment, so we only work with
+        # standard arrays
+        if not (
+            type(self.data) is np.ndarray
+            and self.data.flags.writeable
+            and np.result_type(self.data, other_data) == self.data.dtype
+        ):
+            return self._apply_binary(other, function)
+
+        try:
+            function(self.data, other_data, out=self.data)
+        except TypeError:
+            # This happens when the output of function has a different type
+            # (e.g., dividing integers). NumPy checks this before computing
+            # anything, so the data is not modified.
+            return self._apply_binary(other, function)
+        return self
+
+    def __iadd__(self, other):
+        return self._apply_binary_in_place(other, np.add)
+
+    def __isub__(self, other):
+        return self._apply_binary_in_place(other, np.subtract)
+
+    def __imul__(self, other):
+        return self._apply_binary_in_place(other, np.multiply)
+
+    def __itruediv__(self, other):
+        if other == 0:
+            raise ValueError("Cannot divide by zero")
+        return self._apply_binary_in_place(other, np.divide)
+
     def __eq__(self, other):
         if not isinstance(other, type(self)):
             return False
@@ -1774,10 +2157,12 @@ class HierarchicalGridData(BaseNumerical):
 
         components = {}
 
-        # Organize the components and create a copy. In creating a copy we
-        # declare ownership of the UniformGridData
+        # Organize the components by refinement level. We do not copy them
+        # here: _try_merge_components always returns new objects, so we
+        # declare ownership of the UniformGridData without copying the data
+        # twice
         for comp in uniform_grid_data_sorted:
-            components.setdefault(comp.ref_level, []).append(comp.copy())
+            components.setdefault(comp.ref_level, []).append(comp)
 
         self.grid_data_dict = {
             ref_level: self._try_merge_components(comps)
@@ -1785,10 +2170,19 @@ class HierarchicalGridData(BaseNumerical):
         }
 
         # Map between coordinates and which component to use when computing
-        # values. self._component_mapping is a function that takes a point and
-        # returns the associated component. The reason this is an attribute is
-        # to save it and avoid re-computing the mapping all the time
+        # values. self._component_mapping is a list of components and a
+        # function that takes an array of points and returns the indices of
+        # the associated components in that list (see
+        # _compute_component_mapping). The reason this is an attribute is to
+        # save it and avoid re-computing the mapping all the time. None means
+        # that the mapping was not computed yet, False that it cannot be
+        # computed for this grid (see _has_component_mapping)
         self._component_mapping = None
+        # Components sorted from the finest to the coarsest, with arrays with
+        # their lowest and highest vertices (see _components_bounds). This is
+        # used to find which components contain given points without looping
+        # over the components
+        self._components_bounds = None
 
     def _check_ref_factors(self):
         """Check if all the grids have dx that is an integer multiple of dx_finest.
@@ -1860,9 +2254,11 @@ class HierarchicalGridData(BaseNumerical):
     def _compute_component_mapping(self):
         """Scan the grid structure and prepare a map between points and components.
 
-        :returns: Function that maps a point to the UniformGridData at highest
-                  resolution that contains that point.
-        :rtype: callable
+        :returns: List of components and function that maps an array of
+                  points to the indices (in that list) of the
+                  UniformGridData at highest resolution that contain the
+                  points, or None if the mapping cannot be computed.
+        :rtype: tuple of list of :py:class:`~.UniformGridData` and callable
 
         """
 
@@ -1976,54 +2372,65 @@ class HierarchicalGridData(BaseNumerical):
             ]
             finest_map[tuple(slicer)] = component_index
 
-        def get_component(coordinate):
-            """Map a coordinate to the component that contains it."""
+        def get_components_indices(coordinates):
+            """Map an array of coordinates with shape (number of points,
+            number of dimensions) to the indices of the components that contain
+            them."""
 
             # This is like to_tilde, but we floor instead of rounding.
             # God knows why.
-            x_tilde = np.floor((coordinate - origin) / half_dx_finest)
+            x_tilde = np.floor((coordinates - origin) / half_dx_finest)
 
-            if any(
-                ((point_dim < border_dim[0]) or (point_dim >= border_dim[-1]))
-                for point_dim, border_dim in zip(x_tilde, boundaries_tilde)
-            ):
-                raise ValueError(f"{coordinate} outside the grid")
+            outside = np.zeros(len(x_tilde), dtype=bool)
+            for x_tilde_dim, border_dim in zip(x_tilde.T, boundaries_tilde):
+                outside |= (x_tilde_dim < border_dim[0]) | (
+                    x_tilde_dim >= border_dim[-1]
+                )
+            if outside.any():
+                raise ValueError(
+                    f"{coordinates[np.argmax(outside)]} outside the grid"
+                )
 
-            # The list comprehension is over the various dimensions
+            # This is bisect_right for all the points at once, the tuple is
+            # over the various dimensions
             component_index = tuple(
-                bisect_right(boundary_dim, x_tilde_dim) - 1
-                for boundary_dim, x_tilde_dim in zip(boundaries_tilde, x_tilde)
+                np.searchsorted(boundary_dim, x_tilde_dim, side="right") - 1
+                for boundary_dim, x_tilde_dim in zip(
+                    boundaries_tilde, x_tilde.T
+                )
             )
 
-            return all_components[finest_map[component_index]]
+            return finest_map[component_index]
 
-        return get_component
+        return all_components, get_components_indices
 
     @staticmethod
     def _fill_grid_with_components(grid, components):
-        """Given a grid, try to fill it with the components, return eturning a
-        :py:class:`~.UniformGridData` and the indices that actually were used in
-        filling the grid.
+        """Given a grid, try to fill it with the components without their ghost
+        zones, returning the data on the grid and an array with the points that
+        were actually filled.
 
         This happens by iterating over the components and copying data to the
-        output grid, recording what points were filled. We also return the indices
-        of the points that were filled.
+        output array, recording what points were filled. The ghost zones are
+        skipped while copying, so the components do not need to have them
+        removed first.
 
         :param grid: Grid to fill.
         :type grid: :py:class:`~.UniformGrid`
         :param components: Components to fill the grid.
         :type components: list of :py:class:`~.UniformGridData`
 
-        :returns: Merged components and indices used to merge the components.
-        :rtype: tuple of :py:class:`~.UniformGridData` and numpy array
+        :returns: Merged data and boolean array with the points that were
+                  filled.
+        :rtype: tuple of two NumPy arrays
 
         """
 
         # For filling the data, we prepare the array first, and we fill it with
         # the single components. We fill a second array which we use to keep
-        # track of what indices have been filled with the input data.
+        # track of what points have been filled with the input data.
         data = np.zeros(grid.shape, dtype=components[0].data.dtype)
-        indices_used = np.zeros(grid.shape, dtype=components[0].data.dtype)
+        filled = np.zeros(grid.shape, dtype=bool)
 
         if any(
             isinstance(comp.data, np.ma.MaskedArray) for comp in components
@@ -2031,17 +2438,25 @@ class HierarchicalGridData(BaseNumerical):
             data = np.ma.MaskedArray(data)
 
         for comp in components:
+            num_ghost = comp.num_ghost
             # We find the index corresponding to x0 and x1 of the component
-            index_x0 = ((comp.x0 - grid.x0) / grid.dx + 0.5).astype(np.int32)
-            index_x1 = index_x0 + comp.shape
+            # (without ghost zones)
+            index_x0 = (
+                (comp.x0 + num_ghost * comp.dx - grid.x0) / grid.dx + 0.5
+            ).astype(np.int32)
+            index_x1 = index_x0 + comp.shape - 2 * num_ghost
             slicer = tuple(
                 slice(index_j0, index_j1)
                 for index_j0, index_j1 in zip(index_x0, index_x1)
             )
-            data[slicer] = comp.data
-            indices_used[slicer] = np.ones(comp.data.shape)
+            slicer_no_ghosts = tuple(
+                slice(ghost, num_points - ghost)
+                for ghost, num_points in zip(num_ghost, comp.shape)
+            )
+            data[slicer] = comp.data[slicer_no_ghosts]
+            filled[slicer] = True
 
-        return UniformGridData(grid, data), indices_used
+        return data, filled
 
     def _try_merge_components(self, components):
         """Try to merge a list of :py:class:`~.UniformGridData` instances into one,
@@ -2054,7 +2469,8 @@ class HierarchicalGridData(BaseNumerical):
 
         This function always returns a list, even when the components are merged.
         In that case, the return value is a ``[merged]``, where ``merged`` is a
-        :py:class:`~.UniformGridData`.
+        :py:class:`~.UniformGridData`. The returned objects never share data
+        with the input.
 
         :param components: List of components.
         :type components: list of :py:class:`~.UniformGridData`
@@ -2072,32 +2488,45 @@ class HierarchicalGridData(BaseNumerical):
 
         # We remove all the ghost zones so that we can arrange all the grids
         # one next to the other without having to worry about the overlapping
-        # regions
-        components_no_ghosts = [
-            comp.ghost_zones_removed() for comp in components
+        # regions. We only need the grids without ghost zones here, the data is
+        # copied directly from the components to the merged array.
+        grids_no_ghosts = [
+            comp.grid.ghost_zones_removed() for comp in components
         ]
 
         # For convenience, we also order the components from the one with the
         # smallest x0 to the largest, so that we can easily find the
         # coordinates.
         #
-        # We have to transform x.x0 in tuple because we cannot compare NumPy
+        # We have to transform x0 in tuple because we cannot compare NumPy
         # arrays directly for sorting.
-        components_no_ghosts.sort(key=lambda x: tuple(x.x0))
+        order = sorted(
+            range(len(components)), key=lambda i: tuple(grids_no_ghosts[i].x0)
+        )
 
         # Next, we prepare the global grid
-        grid = gdu.merge_uniform_grids(
-            [comp.grid for comp in components_no_ghosts]
+        grid = gdu.merge_uniform_grids(grids_no_ghosts)
+
+        # The components can fill the global grid only if they have at least
+        # as many points. If they do not (e.g., when there are multiple
+        # refinement centers), we know that the components cannot be merged
+        # without allocating and filling the global grid, which could be much
+        # larger than the components.
+        num_points_components = sum(
+            np.prod(grid_no_ghosts.shape) for grid_no_ghosts in grids_no_ghosts
         )
+        if num_points_components < np.prod(grid.shape):
+            return [comp.copy() for comp in components]
 
-        merged_grid_data, indices_used = self._fill_grid_with_components(
-            grid, components_no_ghosts
+        merged_data, filled = self._fill_grid_with_components(
+            grid, [components[i] for i in order]
         )
 
-        if np.amin(indices_used) == 1:
-            return [merged_grid_data]
+        if filled.all():
+            # merged_data is a new array, so we do not need to copy it
+            return [UniformGridData._from_buffer(grid, merged_data)]
 
-        return components
+        return [comp.copy() for comp in components]
 
     def __getitem__(self, key):
         """Return the list of components at the given refinement level.
@@ -2415,7 +2844,11 @@ class HierarchicalGridData(BaseNumerical):
         :returns:  Deep copy of the :py:class:`~.HierarchicalGridData`.
         :rtype:    :py:class:`~.HierarchicalGridData`
         """
-        return type(self)(self.all_components)
+        # The structure is the same, so we do not need to organize and merge
+        # the components again
+        return self._with_components_replaced(
+            [comp.copy() for comp in self.all_components]
+        )
 
     def mask_applied(self, mask, ignore_existing=False):
         """Return a new grid data with given mask applied to the data.
@@ -2471,6 +2904,26 @@ class HierarchicalGridData(BaseNumerical):
 
         return self.all_components == other.all_components
 
+    def _has_component_mapping(self):
+        """Compute the component mapping if needed, and return whether it is
+        available.
+
+        The mapping cannot be computed for all the grids. In that case, we
+        remember it, so that we do not have to check again every time we look
+        for a point.
+
+        :returns: Whether the component mapping is available.
+        :rtype: bool
+        """
+        if self._component_mapping is None:
+            component_mapping = self._compute_component_mapping()
+            # If we get back None, it means that it cannot be computed for
+            # this grid
+            self._component_mapping = (
+                False if component_mapping is None else component_mapping
+            )
+        return self._component_mapping is not False
+
     def _finest_component_at_point_mapping(self, coordinate):
         """Return the component of the most refined level that contains the given
         coordinate assuming a valid input coordinate using the component mapping.
@@ -2485,7 +2938,90 @@ class HierarchicalGridData(BaseNumerical):
         :rtype: :py:class:`~.UniformGridData`
 
         """
-        return self._component_mapping(coordinate)
+        components, get_components_indices = self._component_mapping
+        index = get_components_indices(np.atleast_2d(coordinate))[0]
+        return components[index]
+
+    def _compute_components_bounds(self):
+        """Collect the components and their boundaries in arrays.
+
+        :returns: List of components sorted from the finest to the coarsest
+                  (as in :py:meth:`~.iter_from_finest`), and two arrays with
+                  shape ``(number of components, number of dimensions)``
+                  with the lowest and highest vertices of the components.
+        :rtype: tuple of list of :py:class:`~.UniformGridData`, and two
+                NumPy arrays
+        """
+        components = [comp for _, _, comp in self.iter_from_finest()]
+        lowest_vertices = np.array(
+            [comp.grid.lowest_vertex for comp in components]
+        )
+        highest_vertices = np.array(
+            [comp.grid.highest_vertex for comp in components]
+        )
+        return components, lowest_vertices, highest_vertices
+
+    def _finest_components_indices_at_points(self, points):
+        """Return the indices of the finest components that contain the given
+        points.
+
+        The indices refer to the list of components returned by
+        :py:meth:`~._compute_components_bounds`. All the points are checked
+        against all the components at the same time.
+
+        :param points: Points with shape ``(number of points, number of
+                       dimensions)``.
+        :type points: 2D NumPy array
+
+        :returns: Index of the finest component that contains each point.
+        :rtype: 1D NumPy array of ints
+
+        """
+        if self._components_bounds is None:
+            self._components_bounds = self._compute_components_bounds()
+
+        _, lowest_vertices, highest_vertices = self._components_bounds
+
+        points = np.asarray(points)[:, np.newaxis, :]
+
+        # contained has shape (number of points, number of components)
+        contained = np.all(
+            (points >= lowest_vertices) & (points < highest_vertices),
+            axis=-1,
+        )
+
+        found = contained.any(axis=1)
+        if not found.all():
+            raise ValueError(f"{points[np.argmin(found), 0]} outside the grid")
+
+        # The components are sorted from the finest to the coarsest, so the
+        # first one that contains the point is the one we want. argmax returns
+        # the first occurrence of True.
+        return contained.argmax(axis=1)
+
+    def _finest_components_at_points(self, points):
+        """Return the components of the most refined level that contain the
+        given points, and for each point the index of its component.
+
+        All the points are processed at the same time. The component mapping
+        is used when available.
+
+        :param points: Points with shape ``(number of points, number of
+                       dimensions)``.
+        :type points: 2D NumPy array
+
+        :returns: List of components and index in that list of the finest
+                  component that contains each point.
+        :rtype: tuple of list of :py:class:`~.UniformGridData` and 1D NumPy
+                array of ints
+
+        """
+        if self._has_component_mapping():
+            components, get_components_indices = self._component_mapping
+            return components, get_components_indices(points)
+
+        indices = self._finest_components_indices_at_points(points)
+        return self._components_bounds[0], indices
 
     def _finest_component_at_point_general(self, coordinate):
         """Return the component of the most refined level that contains the given
@@ -2500,13 +3036,8 @@ class HierarchicalGridData(BaseNumerical):
         :rtype: :py:class:`~.UniformGridData`
 
         """
-        # We walk from the finest level to the coarsest. If we find the point,
-        # re return it. If we find nothing, we raise error.
-        for ref_level, comp, grid_data in self.iter_from_finest():
-            if coordinate in grid_data.grid:
-                return self[ref_level][comp]
-
-        raise ValueError(f"{coordinate} outside the grid")
+        index = self._finest_components_indices_at_points([coordinate])[0]
+        return self._components_bounds[0][index]
 
     def finest_component_at_point(self, coordinate, no_checks=False):
         """Return the number and the component index of the most
@@ -2531,13 +3062,7 @@ class HierarchicalGridData(BaseNumerical):
                     f" but the data has dimension {self.num_dimensions}"
                 )
 
-        # If we don't have self._component_mapping, we should try to compute it.
-        # If we get back None, it means that it cannot be computed for this
-        # grid. Here it is the perfectly place where to use the walrus operator.
-        if self._component_mapping is None:
-            self._component_mapping = self._compute_component_mapping()
-
-        if self._component_mapping is not None:
+        if self._has_component_mapping():
             finder = self._finest_component_at_point_mapping
         else:
             finder = self._finest_component_at_point_general
@@ -2573,8 +3098,15 @@ class HierarchicalGridData(BaseNumerical):
             # The way we want the coordinates is like as an array with the same
             # shape of the grid and with values the coordinates (as arrays). This
             # is similar to as_same_shape, but the coordinates have to be the
-            # value, and not the first index.
-            x = np.moveaxis(x.coordinates(as_same_shape=True), 0, -1)
+            # value, and not the first index. We fill the array directly from
+            # the sparse coordinates, so that it is allocated only once and it
+            # is contiguous (so that we can reshape it without copying).
+            points = np.empty((*x.shape, x.num_dimensions))
+            for dim, coordinate in enumerate(
+                x.coordinates(as_same_shape=True, sparse=True)
+            ):
+                points[..., dim] = coordinate
+            x = points
 
         # We flatten the array (up to the last dimension) and we save the
         # original shape, because we are going to reshape it at the end.
@@ -2582,44 +3114,30 @@ class HierarchicalGridData(BaseNumerical):
         original_shape = points_arr.shape
         points_arr = points_arr.reshape(-1, points_arr.shape[-1])
 
-        # NOTE: The following algorithm is not the fastest but it doesn't matter
-        #       too much because UniformGridData.evaluate_with_spline dominates
-        #       the execution time.
-        #
-        #       Note also that is it tested by testing finest_component_at_point
-        #       (and not directly)
+        # NOTE: This is tested by testing finest_component_at_point (and not
+        #       directly)
 
-        # Next, we organize points depending on the component/refinement level
-        # they belong.
-        #
-        # level_comps is a dictionary with keys the refinement levels and
-        # components for which we have to compute points and for values a list
-        # with the index of the points in points_arr. We need the indices because
-        # we need to put back the values where they were, since we are going to
-        # take bit and pieces of the array.
-        #
-        # Then, we have another mapping level_comps_data that has as keys the
-        # same keys as level_comps, but values the actual component
-        # (UniformGridData) that has to be used for the calculation
-        level_comps = {}
-        level_comps_data = {}
-        for index, point in enumerate(points_arr):
-            data = self.finest_component_at_point(point, no_checks=True)
-            ref_level, comp = data.ref_level, data.component
-            level_comps.setdefault((ref_level, comp), []).append(index)
-            level_comps_data.setdefault((ref_level, comp), data)
-
-        # Now, we can evaluate the points using the methods of UniformGridData.
-        # We collect all results in a new array that is initially full of zeros
+        # First, we find the component that contains each point (for all the
+        # points at once). components_indices contains for each point the
+        # index of the component in the list components.
+        components, components_indices = self._finest_components_at_points(
+            points_arr
+        )
+
+        # Now, we can evaluate the points using the methods of UniformGridData,
+        # all the points that belong to the same component at once. We need
+        # the indices of the points because we need to put back the values
+        # where they were, since we are going to take bit and pieces of the
+        # array. We collect all results in a new array that is initially full
+        # of zeros.
         ret = np.zeros(len(points_arr), dtype=self.dtype)
-        for (ref_level, comp), points_indices in level_comps.items():
-            points = points_arr[level_comps[ref_level, comp]]
-            evaluated_points = level_comps_data[
-                (ref_level, comp)
-            ].evaluate_with_spline(
-                points, ext=ext, piecewise_constant=piecewise_constant
+        for index in np.unique(components_indices):
+            points_indices = np.flatnonzero(components_indices == index)
+            ret[points_indices] = components[index].evaluate_with_spline(
+                points_arr[points_indices],
+                ext=ext,
+                piecewise_constant=piecewise_constant,
             )
-            ret[points_indices] = evaluated_points
 
         # Finally, we have to reshape the array to the correct form.
         ret = ret.reshape(original_shape[:-1])
@@ -2642,7 +3160,9 @@ class HierarchicalGridData(BaseNumerical):
         :type resample: bool
 
         """
-        return UniformGridData(
+        # The output of evaluate_with_spline is a new array, so we do not need
+        # to copy it
+        return UniformGridData._from_buffer(
             grid,
             self.evaluate_with_spline(grid, piecewise_constant=(not resample)),
         )
@@ -2709,9 +3229,9 @@ class HierarchicalGridData(BaseNumerical):
         # finest_dx can have zero entries, for which a shape of 1 should
         # correspond. There can zero entries, we substitute them with -1, so
         # that we can identify them as negative numbers
-        new_dx = np.array([dx if dx > 0 else -1 for dx in self.finest_dx])
+        new_dx = np.where(self.finest_dx > 0, self.finest_dx, -1)
         new_shape = ((self.x1 - self.x0) / new_dx + 1.5).astype(np.int64)
-        new_shape = np.array([s if s > 0 else 1 for s in new_shape])
+        new_shape = np.where(new_shape > 0, new_shape, 1)
 
         return self.to_UniformGridData(
             new_shape,
@@ -2736,6 +3256,7 @@ class HierarchicalGridData(BaseNumerical):
         self.grid_data_dict = ret.grid_data_dict
         # We need to invalidate the _component_mapping (it may have changed)
         self._component_mapping = None
+        self._components_bounds = None
 
     def _apply_binary(self, other, function, *args, **kwargs):
         """Apply a binary function to the data of ``self`` and ``other``.
@@ -2759,14 +3280,14 @@ class HierarchicalGridData(BaseNumerical):
                     self.all_components, other.all_components
                 )
             ]
-            return type(self)(new_data)
+            return self._with_components_replaced(new_data)
 
         if isinstance(other, (int, float, complex)):
             new_data = [
                 function(data_self, other, *args, **kwargs)
                 for data_self in self.all_components
             ]
-            return type(self)(new_data)
+            return self._with_components_replaced(new_data)
 
         # If we are here, it is because we cannot add the two objects
         raise TypeError("I don't know how to combine these objects")
@@ -2798,6 +3319,44 @@ class HierarchicalGridData(BaseNumerical):
             **kwargs,
         )
 
+    def _reduce_components(self, method_name, reduction):
+        """Call the reduction method ``method_name`` on each component and
+        combine the results with ``reduction``.
+
+        This is faster than calling :py:meth:`~._apply_reduction` because it
+        does not create new :py:class:`~.HierarchicalGridData` (e.g., for the
+        absolute value).
+
+        :param method_name: Name of the reduction method of
+                            :py:class:`~.UniformGridData`.
+        :type method_name: str
+        :param reduction: Function to combine the results.
+        :type reduction: callable
+
+        :return: Output of the reduction on the data.
+        :rtype: float
+
+        """
+        return reduction(
+            [getattr(comp, method_name)() for comp in self.all_components]
+        )
+
+    def abs_min(self):
+        """Return the minimum of the absolute value"""
+        return self._reduce_components("abs_min", np.min)
+
+    def abs_max(self):
+        """Return the maximum of the absolute value"""
+        return self._reduce_components("abs_max", np.max)
+
+    def abs_nanmin(self):
+        """Return the minimum of the absolute value ignoring NaNs"""
+        return self._reduce_components("abs_nanmin", np.nanmin)
+
+    def abs_nanmax(self):
+        """Return the maximum of the absolute value ignoring NaNs"""
+        return self._reduce_components("abs_nanmax", np.nanmax)
+
     def _apply_unary(self, function, *args, **kwargs):
         """Apply a unary function to the data.
 
@@ -2817,7 +3376,49 @@ class HierarchicalGridData(BaseNumerical):
             data._apply_unary(function, *args, **kwargs)
             for data in self.all_components
         ]
-        return type(self)(new_data)
+        return self._with_components_replaced(new_data)
+
+    def _with_components_replaced(self, new_components):
+        """Return a new :py:class:`~.HierarchicalGridData` with the same
+        structure as ``self`` and the given components.
+
+        The default constructor copies all the components and tries to merge
+        them. When the new components are the result of an operation on the
+        components of ``self`` that does not change the grids (e.g., a
+        mathematical operation), the components are already organized and
+        merged, so we can use them directly. Components that share memory with
+        those of ``self`` are copied.
+
+        This function is not meant to be called directly.
+
+        :param new_components: Components, in the same order as
+                               :py:meth:`~.all_components`.
+        :type new_components: list of :py:class:`~.UniformGridData`
+
+        :returns: New object with the given components.
+        :rtype: :py:class:`~.HierarchicalGridData`
+        """
+        old_components = self.all_components
+
+        if len(new_components) != len(old_components) or not all(
+            isinstance(new, UniformGridData) and new.grid == old.grid
+            for new, old in zip(new_components, old_components)
+        ):
+            return type(self)(new_components)
+
+        new_components = iter(
+            new.copy() if np.may_share_memory(new.data, old.data) else new
+            for new, old in zip(new_components, old_components)
+        )
+
+        ret = type(self).__new__(type(self))
+        ret.grid_data_dict = {
+            ref_level: [next(new_components) for _ in comps]
+            for ref_level, comps in self.grid_data_dict.items()
+        }
+        ret._component_mapping = None
+        ret._components_bounds = None
+        return ret
 
     def _call_component_method(
         self, method_name, *args, method_returns_list=False, **kwargs
@@ -38,7 +38,9 @@ The functions available are:
 
 """
 import ast  # To read metadata in ASCII files
+import inspect
 import re
+import warnings
 from bz2 import open as bopen
 from gzip import open as gopen
 from os.path import splitext
@@ -47,6 +49,13 @@ import numpy as np
 
 from kuibit import grid_data as gd
 
+# numba is optional. When it is available, we use it to compile functions that
+# have to be sampled point by point on large grids (see _evaluate_pointwise).
+try:
+    from numba import vectorize as numba_vectorize
+except ImportError:  # pragma: no cover
+    pass
+
 
 def common_bounding_box(grids):
     """Return the corners of smallest common bounding box of a list of
@@ -80,16 +89,11 @@ def common_bounding_box(grids):
     # We put x0 and x1 in arrays:
     # x0s = [[0, 0], [-1, 0], [-3, 3]]
     # x1s = [[5, 5], [2, 2], [1, 2]]
-    # Now, if we transpose that, we have
-    # x0sT = [[0, -1, 0],
-    #         [0, 0, 3]]
-    # x1sT = [[5, 2, 1],
-    #         [5, 2, 2]]
-    # In this way we put all the same coordinates in a single
-    # row. We can take the minimum and maximum along these rows
-    # to find the common bounding box.
-    x0 = np.array([min(b) for b in np.transpose(x0s)])
-    x1 = np.array([max(b) for b in np.transpose(x1s)])
+    # In this way each column contains the same coordinate for all the grids.
+    # We take the minimum and maximum along the columns to find the common
+    # bounding box.
+    x0 = x0s.min(axis=0)
+    x1 = x1s.max(axis=0)
     return (x0, x1)
 
 
@@ -251,15 +255,25 @@ def load_UniformGridData(path, *args, **kwargs):
     return gd.UniformGridData.from_grid_structure(data, **metadata)
 
 
-def sample_function_from_uniformgrid(function, grid):
+def sample_function_from_uniformgrid(function, grid, separable=False):
     """Create a regular dataset by sampling a scalar function of the form
     ``f(x, y, z, ...)`` on a grid.
 
+    If ``separable`` is True, ``function`` has to be a list of functions of one
+    variable, ``[f0, f1, ...]``, and the sampled function is their product
+    ``f0(x) * f1(y) * ...``. This is much faster, since each function is only
+    evaluated along its own direction (see
+    :py:meth:`~.UniformGridData.from_separable`).
+
     :param function:  The function to sample.
     :type function:   A callable that takes as many arguments as the number
-                      of dimensions (in shape).
+                      of dimensions (in shape), or a list of callables that
+                      take one argument if ``separable`` is True.
     :param grid:   Grid over which to sample the function.
     :type grid:    :py:class:`~.UniformGrid`
+    :param separable: Whether ``function`` is a list of functions of one
+                      variable to be multiplied together.
+    :type separable: bool
     :returns:     Sampled data.
     :rtype:       :py:class:`~.UniformGridData`
 
@@ -267,38 +281,131 @@ def sample_function_from_uniformgrid(function, grid):
     if not isinstance(grid, gd.UniformGrid):
         raise TypeError("grid has to be a UniformGrid")
 
-    # The try except block checks that the function supplied has the correct
-    # signature for the grid provided. If you try to pass a function that takes
-    # too many of too few arguments, you will get a TypeError
+    if separable:
+        return gd.UniformGridData.from_separable(grid, function)
+
+    _check_number_of_arguments(function, grid.num_dimensions)
+
+    # Most functions are written in terms of NumPy operations, so we can
+    # evaluate them directly on arrays. Instead of preparing the coordinates
+    # with the full shape of the grid, we reshape the 1D coordinates so that
+    # each one extends only along its own axis (as np.ogrid does). NumPy
+    # broadcasting takes care of producing the output with the full shape,
+    # without calling the function once per point.
+    #
+    # The sparse coordinates are read-only, so functions that write to their
+    # arguments fail instead of silently returning garbage.
+    sparse_coordinates = grid.coordinates(as_same_shape=True, sparse=True)
 
     try:
-        ret = gd.UniformGridData(
-            grid, np.vectorize(function)(*grid.coordinates(as_same_shape=True))
+        data = np.asarray(function(*sparse_coordinates))
+        # Functions that do not depend on all the coordinates (or constant
+        # functions) return arrays that are smaller than the grid, so we
+        # broadcast them
+        data = np.broadcast_to(data, grid.shape)
+    except (TypeError, ValueError):
+        # If we are here, the function cannot be evaluated on arrays (e.g.,
+        # because it contains if statements), so we fall back to evaluating it
+        # point by point. The output is a new array, so we do not need to
+        # copy it.
+        return gd.UniformGridData._from_buffer(
+            grid,
+            _evaluate_pointwise(function, sparse_coordinates),
+            inputs=sparse_coordinates,
         )
-    except TypeError as type_err:
-        # Too few arguments, type_err = missing N required positional arguments: ....
-        # Too many arguments, type_err = takes N positional arguments but M were given
-        ret = str(type_err)
 
-    # TODO (REFACTORING): This is fragile way to do error parsing
-    #
-    # We are reading the error message to understand what is going on. This
-    # can is not the best way to do this.
-    if isinstance(ret, str):
-        if "missing" in ret:
-            raise TypeError(
-                "Provided function takes too few arguments for requested grid"
-            )
-        if "takes" in ret:
-            raise TypeError(
-                "Provided function takes too many arguments for requested grid"
-            )
-        raise TypeError(ret)
-
-    return ret
-
-
-def sample_function(function, shape, x0, x1, *args, **kwargs):
+    # Here data may be a (read-only) broadcast view or an array owned by
+    # someone else, so we have to copy it
+    return gd.UniformGridData(grid, data)
+
+
+def _evaluate_pointwise(function, coordinates, force_numba=False):
+    """Evaluate a scalar function on each point of the grid defined by the
+    given coordinates.
+
+    When numba is available and the grid is large, ``function`` is compiled to
+    a NumPy ufunc, so that the loop over the points runs without the
+    interpreter. Compiling takes longer than evaluating the function on small
+    grids, so in that case we use ``np.vectorize``, unless ``force_numba`` is
+    True. If numba cannot compile ``function`` (e.g., because it uses Python
+    objects that numba does not support), we fall back to ``np.vectorize``.
+
+    :param function: Function that takes as many scalars as coordinates.
+    :type function: callable
+    :param coordinates: Coordinates that broadcast to the shape of the grid.
+    :type coordinates: list of NumPy arrays
+    :param force_numba: Use numba (if available) regardless of the size of the
+                        grid.
+    :type force_numba: bool
+
+    :returns: Values of ``function`` on the grid.
+    :rtype: NumPy array
+
+    """
+    size = np.broadcast(*coordinates).size
+
+    if force_numba and "numba_vectorize" not in globals():
+        warnings.warn("numba not available, ignoring force_numba")
+
+    if "numba_vectorize" in globals() and (force_numba or size >= 10**6):
+        try:
+            return numba_vectorize(function)(*coordinates)
+        # numba raises several different errors when it cannot compile a
+        # function
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    # np.vectorize broadcasts its inputs, so we do not need the coordinates
+    # with full shape here either.
+    return np.vectorize(function)(*coordinates)
+
+
+def _check_number_of_arguments(function, num_arguments):
+    """Check that ``function`` can be called with ``num_arguments`` positional
+    arguments, raising a ``TypeError`` if it cannot.
+
+    If the signature of the function cannot be inspected, no check is
+    performed.
+
+    :param function: Function to check.
+    :type function: callable
+    :param num_arguments: Number of positional arguments.
+    :type num_arguments: int
+
+    """
+    # NumPy ufuncs do not have a signature, but they know how many inputs they
+    # take
+    if isinstance(function, np.ufunc):
+        min_arguments = max_arguments = function.nin
+    else:
+        try:
+            parameters = inspect.signature(function).parameters.values()
+        except (TypeError, ValueError):
+            return
+
+        positional_kinds = (
+            inspect.Parameter.POSITIONAL_ONLY,
+            inspect.Parameter.POSITIONAL_OR_KEYWORD,
+        )
+        positional = [p for p in parameters if p.kind in positional_kinds]
+
+        min_arguments = sum(p.default is p.empty for p in positional)
+        if any(p.kind == inspect.Parameter.VAR_POSITIONAL for p in parameters):
+            max_arguments = np.inf
+        else:
+            max_arguments = len(positional)
+
+    if num_arguments > max_arguments:
+        raise TypeError(
+            "Provided function takes too few arguments for requested grid"
+        )
+    if num_arguments < min_arguments:
+        raise TypeError(
+            "Provided function takes too many arguments for requested grid"
+        )
+
+
+def sample_function(function, shape, x0, x1, *args, separable=False, **kwargs):
     """Create a regular dataset by sampling a scalar function of the form
     ``f(x, y, z, ...)`` on a grid.
 
@@ -307,16 +414,23 @@ def sample_function(function, shape, x0, x1, *args, **kwargs):
 
     :param function:  The function to sample.
     :type function:   A callable that takes as many arguments as the number
-                      of dimensions (in shape).
+                      of dimensions (in shape), or a list of callables that
+                      take one argument if ``separable`` is True.
     :param shape: Number of sample points in each dimension.
     :type shape:  1d NumPy array or list of int
     :param x0:    Minimum corner of regular sample grid.
     :type x0:     1d NumPy array or list of float
     :param x0:    Maximum corner of regular sample grid.
     :type x0:     1d NumPy array or list of float
+    :param separable: Whether ``function`` is a list of functions of one
+                      variable to be multiplied together (see
+                      :py:func:`~.sample_function_from_uniformgrid`).
+    :type separable: bool
     :returns:     Sampled data.
     :rtype:       :py:class:`~.UniformGridData`
 
     """
     grid = gd.UniformGrid(shape, x0=x0, x1=x1, *args, **kwargs)
-    return sample_function_from_uniformgrid(function, grid)
+    return sample_function_from_uniformgrid(
+        function, grid, separable=separable
+    )
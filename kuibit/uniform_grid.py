@@ -26,9 +26,37 @@ geometry of a uniform Cartesian cell-centered grid.
 This is a basic building block of :py:class:`~.UniformGridData`.
 
 """
+from functools import lru_cache
+
 import numpy as np
 
 
+@lru_cache(maxsize=256)
+def _axis_coordinates(num_points, x0, dx):
+    """Return the coordinates along an axis with ``num_points`` points,
+    starting from ``x0`` and with spacing ``dx``.
+
+    Many grids share the same axes (for example, copies of the same grid), so
+    the arrays are saved and shared among them. For this reason, the arrays
+    are read-only.
+
+    :param num_points: Number of points.
+    :type num_points: int
+    :param x0: First point.
+    :type x0: float
+    :param dx: Spacing.
+    :type dx: float
+
+    :returns: Coordinates along the axis.
+    :rtype: 1d NumPy array
+    """
+    # We use dx directly instead of np.linspace, so that the last point is
+    # computed exactly as x1
+    coordinates = x0 + np.arange(num_points) * dx
+    coordinates.flags.writeable = False
+    return coordinates
+
+
 class UniformGrid:
     """Describes the geometry of a regular rectangular dataset, as well as
     information needed to identify the grid if part of refined grid hierarchy
@@ -206,6 +234,12 @@ class UniformGrid:
             self.__num_ghost = np.atleast_1d(np.array(num_ghost, dtype=int))
             self._check_dims(self.num_ghost, "num_ghost")
 
+        # The grid is immutable, so we make sure that the arrays that define
+        # it cannot be modified in place. This is what allows us to save the
+        # derived quantities below.
+        for array in (self.__shape, self.__x0, self.__dx, self.__num_ghost):
+            array.flags.writeable = False
+
         self.__ref_level = int(ref_level)
         self.__component = int(component)
         self.__time = None if time is None else float(time)
@@ -216,6 +250,23 @@ class UniformGrid:
         self.__coordinates_1d = None
         # Same with x1
         self.__x1 = None
+        # Same with the other derived properties, which are used in most of the
+        # operations with UniformGridData
+        self.__dv = None
+        self.__volume = None
+        # The extended dimensions are used as a mask by most of the methods
+        # that deal with flat dimensions, so we compute them only once
+        self.__extended_dimensions = self.shape > 1
+        self.__extended_dimensions.flags.writeable = False
+        self.__num_extended_dimensions = int(
+            np.count_nonzero(self.__extended_dimensions)
+        )
+        # This is used to quickly compare grids (see _key)
+        self.__key = None
+        # The class is immutable, so we can save the hash and the string
+        # representation the first time they are computed
+        self.__hash = None
+        self.__str = None
 
         # The method __contains__ is called extremely often when dealing with
         # HierachicalGridData (because it is used to find which subgrid
@@ -227,12 +278,42 @@ class UniformGrid:
         # Same considerations for num_dimensions
         self.__num_dimensions = len(self.shape)
 
+    @property
+    def _key(self):
+        """Return a tuple that identifies exactly the grid.
+
+        Two grids with the same key are equal. Most of the grids that are
+        compared come from the same operations, so they are bitwise identical.
+        Comparing the keys is faster than comparing the arrays up to numerical
+        precision, so we do this first.
+
+        :returns: Bytes of the arrays and values of the other members.
+        :rtype: tuple
+        """
+        if self.__key is None:
+            # The dtypes of the arrays are fixed in __init__, so it is safe to
+            # compare their bytes
+            self.__key = (
+                self.shape.tobytes(),
+                self.x0.tobytes(),
+                self.dx.tobytes(),
+                self.num_ghost.tobytes(),
+                self.ref_level,
+                self.component,
+                self.time,
+                self.iteration,
+            )
+        return self.__key
+
     def __hash__(self):
         """UniformGrid is immutable, we can define an hash as the composition of
-        the hashes of the members. This hash is quite slow to compute, so it
-        is not useful for caching small computations. Having an hash function
-        solidifies the idea that this class is immutable.
+        the hashes of the members. The hash is computed the first time it is
+        needed and saved. Having an hash function solidifies the idea that this
+        class is immutable.
         """
+        if self.__hash is not None:
+            return self.__hash
+
         # We convert all the arrays in tuples (because they are hashable)
         hash_shape = hash(tuple(self.shape))
         hash_x0 = hash(tuple(self.x0))
@@ -244,7 +325,7 @@ class UniformGrid:
         hash_iteration = hash(self.iteration)
 
         # ^ = bitwise xor
-        return (
+        self.__hash = (
             hash_shape
             ^ hash_x0
             ^ hash_dx
@@ -254,6 +335,7 @@ class UniformGrid:
             ^ hash_time
             ^ hash_iteration
         )
+        return self.__hash
 
     @property
     def x0(self):
@@ -283,6 +365,7 @@ class UniformGrid:
         # We save x1 because it is computed a lot of times
         if self.__x1 is None:
             self.__x1 = self.x0 + (self.shape - 1) * self.dx
+            self.__x1.flags.writeable = False
         return self.__x1
 
     @property
@@ -368,7 +451,9 @@ class UniformGrid:
         :returns: Volume of a grid cell.
         :rtype:   float
         """
-        return self.dx.prod()
+        if self.__dv is None:
+            self.__dv = self.dx.prod()
+        return self.__dv
 
     @property
     def volume(self):
@@ -377,7 +462,9 @@ class UniformGrid:
         :returns: Volume of the whole grid.
         :rtype:   float
         """
-        return self.shape.prod() * self.dv
+        if self.__volume is None:
+            self.__volume = self.shape.prod() * self.dv
+        return self.__volume
 
     @property
     def num_dimensions(self):
@@ -396,7 +483,7 @@ class UniformGrid:
         :returns: Dimensions with more than one point.
         :rtype:   1d NumPy of bools
         """
-        return self.shape > 1
+        return self.__extended_dimensions
 
     @property
     def num_extended_dimensions(self):
@@ -405,7 +492,7 @@ class UniformGrid:
         :returns: The number of extended dimensions (the ones with more than one cell).
         :rtype:   int
         """
-        return sum(self.extended_dimensions)
+        return self.__num_extended_dimensions
 
     @property
     def lowest_vertex(self):
@@ -417,6 +504,7 @@ class UniformGrid:
         """
         if self.__lowest_vertex is None:
             self.__lowest_vertex = self.x0 - 0.5 * self.dx
+            self.__lowest_vertex.flags.writeable = False
         return self.__lowest_vertex
 
     @property
@@ -429,6 +517,7 @@ class UniformGrid:
         """
         if self.__highest_vertex is None:
             self.__highest_vertex = self.x1 + 0.5 * self.dx
+            self.__highest_vertex.flags.writeable = False
         return self.__highest_vertex
 
     def indices_to_coordinates(self, indices):
@@ -452,21 +541,32 @@ class UniformGrid:
 
         """
         # TODO (FEATURE): Add dimensionality checks
-        indices = (
-            ((np.asarray(coordinates) - self.x0) / self.dx) + 0.5
-        ).astype(np.int32)
-        return indices
+
+        # This works with one or multiple points at the same time, because the
+        # operations broadcast along the last axis.
+        #
+        # We round to the nearest cell with floor(x + 0.5). This is what
+        # __contains__ does with the cell faces (the lower face belongs to the
+        # cell, the upper one does not). Truncating with astype would round
+        # towards zero, mapping points that are up to one cell below the grid
+        # to the first cell, and np.rint rounds to the closest even number.
+        # We use np.intp because we use the indices to index arrays.
+        return np.floor(
+            (np.asarray(coordinates) - self.x0) / self.dx + 0.5
+        ).astype(np.intp)
 
     def __getitem__(self, index):
         """Return the coordinates corresponding to a given (multi-dimensional)
         index.
         """
-        index = np.array(index)
+        index = np.asarray(index)
         self._check_dims(index, "index")
-        coordinate = index * self.dx + self.x0
-        if coordinate not in self:
+        # We check the bounds directly on the indices, so that we don't have to
+        # compare floating point numbers with the cell faces (which also fails
+        # on dimensions with only one point, where dx is zero)
+        if np.any(index < 0) or np.any(index >= self.shape):
             raise ValueError(f"{index} is not in on the grid")
-        return coordinate
+        return self.indices_to_coordinates(index)
 
     def __contains__(self, point):
         """Test if a coordinate is contained in the grid. The size of the
@@ -517,19 +617,26 @@ class UniformGrid:
         """Return coordinates of the grid points.
 
         The return value is a list with the coordinates along each direction.
+        The arrays are read-only because they are shared among all the calls.
 
         :returns: Coordinates of the grid points on each direction.
         :rtype: list of 1d NumPy array
 
         """
         if self.__coordinates_1d is None:
-            self.__coordinates_1d = [
-                np.linspace(x0, x1, n)
-                for n, x0, x1 in zip(self.shape, self.x0, self.x1)
-            ]
-        return self.__coordinates_1d
+            # The grid is immutable, so the coordinates never change. The
+            # arrays are read-only, so nobody can modify them in place
+            self.__coordinates_1d = tuple(
+                _axis_coordinates(int(n), float(x0), float(dx))
+                for n, x0, dx in zip(self.shape, self.x0, self.dx)
+            )
+        # We return a new list, so that callers can freely modify the list
+        # (not the arrays) without affecting the saved coordinates
+        return list(self.__coordinates_1d)
 
-    def coordinates(self, as_meshgrid=False, as_same_shape=False):
+    def coordinates(
+        self, as_meshgrid=False, as_same_shape=False, sparse=False
+    ):
         """Return coordinates of the grid points.
 
         If ``as_meshgrid`` is True, the coordinates are returned as NumPy
@@ -542,6 +649,15 @@ class UniformGrid:
         computations involving the coordinates. The output of ``as_same_shape``
         is the same as using ``np.mgrid``.
 
+        If ``sparse`` is True (and one between ``as_meshgrid`` and
+        ``as_same_shape`` is True), the arrays returned do not have the full
+        shape, but they only extend along the direction of the coordinate they
+        represent (the other dimensions have size one). These arrays broadcast
+        to the full ones, so they can be used in computations involving the
+        coordinates using a fraction of the memory. With ``as_same_shape``, the
+        output is the same as using ``np.ogrid``. The sparse arrays are
+        read-only.
+
         :param as_meshgrid: If True, return the coordinates as meshgrid.
         :type as_meshgrid: bool
         :param as_same_shape: If True, return the coordinates as a list
@@ -551,6 +667,9 @@ class UniformGrid:
                               will be three lists with ``shape = self.shape``.
                               This is equivalent to ``np.mgrid``.
         :type as_same_shape: bool
+        :param sparse: If True, return arrays that broadcast to the full shape
+                       instead of the full arrays.
+        :type sparse: bool
         :returns:  Grid coordinates.
         :rtype:   list of NumPy arrays with the same shape as grid
 
@@ -558,17 +677,28 @@ class UniformGrid:
         if as_meshgrid and as_same_shape:
             raise ValueError("Cannot ask for both meshgrid and shaped array.")
 
+        # With sparse=True and copy=False, np.meshgrid returns views of the
+        # saved 1D coordinates (which are read-only), so there is no
+        # allocation at all
+
         if as_meshgrid:
-            return np.meshgrid(*self.coordinates_1d)
+            return np.meshgrid(
+                *self.coordinates_1d, sparse=sparse, copy=not sparse
+            )
 
         if as_same_shape:
-            # np.indeces prepares an array in which each element has the value
-            # of its index
-            indices = np.indices(self.shape)
-            # Here we transform the index into coordinate, along each dimension
+            # The sparse coordinates are the 1D coordinates reshaped so that
+            # they extend only along their own axis
+            sparse_coordinates = np.meshgrid(
+                *self.coordinates_1d, indexing="ij", sparse=True, copy=False
+            )
+            if sparse:
+                return sparse_coordinates
+            # Here we broadcast the coordinates to the full shape. We have to
+            # copy them because np.broadcast_to returns read-only views.
             return [
-                indices[dim] * self.dx[dim] + self.x0[dim]
-                for dim in range(0, self.shape.size)
+                np.broadcast_to(coordinate, self.shape).copy()
+                for coordinate in sparse_coordinates
             ]
 
         return self.coordinates_1d
@@ -583,17 +713,20 @@ class UniformGrid:
 
         # We need this infrastructure to slice UniformGridData
 
-        copied = self.copy()
-
-        # We have to save this, otherwise it would be recomputed at every line,
-        # affecting the result.
-        extended_dims = copied.extended_dimensions
+        # We create a new object instead of modifying a copy, so that all the
+        # derived quantities (e.g., num_dimensions) are consistent
+        extended_dims = self.extended_dimensions
 
-        copied.__shape = copied.__shape[extended_dims]
-        copied.__x0 = copied.__x0[extended_dims]
-        copied.__dx = copied.__dx[extended_dims]
-        copied.__num_ghost = copied.__num_ghost[extended_dims]
-        return copied
+        return type(self)(
+            self.shape[extended_dims],
+            x0=self.x0[extended_dims],
+            dx=self.dx[extended_dims],
+            ref_level=self.ref_level,
+            component=self.component,
+            num_ghost=self.num_ghost[extended_dims],
+            time=self.time,
+            iteration=self.iteration,
+        )
 
     def ghost_zones_removed(self):
         """Return a new :py:class:`~.UniformGrid` with ghostzones removed.
@@ -601,15 +734,17 @@ class UniformGrid:
         :returns: Return a new grid without ghost zones.
         :rtype: :py:class:`~.UniformGrid`
         """
-        copied = self.copy()
-
         # We remove twice the number of ghost zones because there are
-        # lower and upper ghostzones
-        copied.__shape = self.shape - 2 * self.num_ghost
-        # We "push x0 inside the grid"
-        copied.__x0 = copied.__x0 + self.num_ghost * self.dx
-        copied.__num_ghost = np.zeros_like(copied.shape)
-        return copied
+        # lower and upper ghostzones. We "push x0 inside the grid".
+        return type(self)(
+            self.shape - 2 * self.num_ghost,
+            x0=self.x0 + self.num_ghost * self.dx,
+            dx=self.dx,
+            ref_level=self.ref_level,
+            component=self.component,
+            time=self.time,
+            iteration=self.iteration,
+        )
 
     def shifted(self, shift):
         """Return a new UniformGrid with coordinates shifted by the given amount.
@@ -625,11 +760,17 @@ class UniformGrid:
         shift = np.asarray(shift)
         self._check_dims(shift, "shift")
 
-        copied = self.copy()
-
         # We only need to shift x0 because x1 is computed from x0 using dx
-        copied.__x0 = copied.__x0 + shift
-        return copied
+        return type(self)(
+            self.shape,
+            x0=self.x0 + shift,
+            dx=self.dx,
+            ref_level=self.ref_level,
+            component=self.component,
+            num_ghost=self.num_ghost,
+            time=self.time,
+            iteration=self.iteration,
+        )
 
     def copy(self):
         """Return a deep copy.
@@ -655,6 +796,9 @@ class UniformGrid:
         """
         if not isinstance(other, type(self)):
             return False
+        # Fast path for grids that are bitwise identical
+        if self._key == other._key:
+            return True
         # Time and iterations can be None, so we check them independently
         if self.time is not None and other.time is not None:
             time_bool = np.isclose(self.time, other.time, atol=1e-14)
@@ -683,7 +827,10 @@ class UniformGrid:
 
     def __str__(self):
         """:returns: a string describing the geometry."""
-        return f"""Shape            = {self.shape}
+        if self.__str is not None:
+            return self.__str
+
+        self.__str = f"""Shape            = {self.shape}
 Num ghost zones  = {self.num_ghost}
 Ref. level       = {self.ref_level}
 Component        = {self.component}
@@ -696,3 +843,4 @@ dx               = {self.dx}
 Time             = {self.time}
 Iteration        = {self.iteration}
 """
+        return self.__str
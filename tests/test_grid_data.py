@@ -106,6 +106,13 @@ class TestUniformGrid(unittest.TestCase):
 
         self.assertCountEqual(geom5.extended_dimensions, [True, True, False])
         self.assertEqual(geom5.num_extended_dimensions, 2)
+        self.assertIsInstance(geom5.num_extended_dimensions, int)
+
+        # Test that the grid cannot be modified in place
+        with self.assertRaises(ValueError):
+            geom5.x0[0] = 2
+        with self.assertRaises(ValueError):
+            geom5.dx[0] = 2
 
         # Test lowest and highest vertices
         self.assertTrue(np.allclose(geom5.lowest_vertex, [0.5, 0.75, 0]))
@@ -154,6 +161,9 @@ class TestUniformGrid(unittest.TestCase):
             ^ hash_iteration,
         )
 
+        # The hash is saved, so it is the same when computed again
+        self.assertEqual(hash(geom4), hash(geom4.copy()))
+
     def test_coordinate_to_indices(self):
         geom = gd.UniformGrid([101, 51], x0=[1, 2], dx=[1, 0.5])
         # Scalar input
@@ -172,6 +182,12 @@ class TestUniformGrid(unittest.TestCase):
                 [[1, 3], [2, 4]],
             )
         )
+        # Points on the lower face of a cell belong to that cell, points
+        # below the lowest face are outside
+        self.assertCountEqual(geom.coordinates_to_indices([1.5, 2]), [1, 0])
+        self.assertCountEqual(
+            geom.coordinates_to_indices([0.4, 1.7]), [-1, -1]
+        )
 
     def test__in__(self):
 
@@ -213,6 +229,8 @@ class TestUniformGrid(unittest.TestCase):
         )
 
         self.assertIn("Num ghost zones  = [3 3]", geom4.__str__())
+        # The string is saved, so it is the same object when called again
+        self.assertIs(geom4.__str__(), geom4.__str__())
 
     def test_coordinates(self):
 
@@ -232,6 +250,17 @@ class TestUniformGrid(unittest.TestCase):
         self.assertTrue(np.allclose(geom4.coordinates_1d[0], x))
         self.assertTrue(np.allclose(geom4.coordinates_1d[1], y))
 
+        # Test that the coordinates cannot be modified
+        with self.assertRaises(ValueError):
+            geom4.coordinates_1d[0][0] = 2
+
+        # Equal grids share the coordinates
+        self.assertIs(geom4.coordinates_1d[0], geom4.copy().coordinates_1d[0])
+
+        modified_coordinates = geom4.coordinates()
+        modified_coordinates[0] = y
+        self.assertTrue(np.allclose(geom4.coordinates()[0], x))
+
         c0 = geom4.coordinates(as_meshgrid=True)
 
         X, Y = np.meshgrid(x, y)
@@ -255,6 +284,23 @@ class TestUniformGrid(unittest.TestCase):
             np.allclose(shaped_array[0][:, 0], geom4.coordinates()[0])
         )
 
+        # Sparse arrays
+        sparse_array = geom4.coordinates(as_same_shape=True, sparse=True)
+        self.assertEqual(sparse_array[0].shape, (11, 1))
+        self.assertEqual(sparse_array[1].shape, (1, 15))
+        for dim in range(2):
+            self.assertTrue(
+                np.allclose(
+                    np.broadcast_to(sparse_array[dim], geom4.shape),
+                    shaped_array[dim],
+                )
+            )
+
+        sparse_meshgrid = geom4.coordinates(as_meshgrid=True, sparse=True)
+        self.assertEqual(sparse_meshgrid[0].shape, (1, 11))
+        self.assertEqual(sparse_meshgrid[1].shape, (15, 1))
+        self.assertTrue(np.allclose(sparse_meshgrid[0] + 0 * Y, X))
+
     def test__getitem__(self):
 
         geom4 = gd.UniformGrid(
@@ -275,6 +321,13 @@ class TestUniformGrid(unittest.TestCase):
         with self.assertRaises(ValueError):
             geom4[[500, 200]]
 
+        with self.assertRaises(ValueError):
+            geom4[[-1, 2]]
+
+        # Check grid with flat dimensions
+        geom5 = gd.UniformGrid([11, 1], x0=[1, 1], dx=[1, 0])
+        self.assertCountEqual(geom5[1, 0], [2, 1])
+
     def test_flat_dimensions_removed(self):
 
         geom = gd.UniformGrid(
@@ -296,6 +349,7 @@ class TestUniformGrid(unittest.TestCase):
         )
 
         self.assertEqual(geom.flat_dimensions_removed(), geom2)
+        self.assertEqual(geom.flat_dimensions_removed().num_dimensions, 2)
 
     def test_flat_ghost_zones_removed(self):
 
@@ -377,12 +431,18 @@ class TestUniformGrid(unittest.TestCase):
 
         self.assertNotEqual(geom5, 2)
 
+        # Equal up to numerical precision, but not bitwise
+        geom6 = gd.UniformGrid([11, 11], x0=[1e-16, 0], x1=[5, 5])
+
+        self.assertNotEqual(geom6._key, geom0._key)
+        self.assertEqual(geom6, geom0)
+
 
 class TestUniformGridData(unittest.TestCase):
     def setUp(self):
         self.geom = gd.UniformGrid([101, 51], x0=[0, 0], x1=[1, 0.5])
 
-        data = np.array([i * np.linspace(1, 5, 51) for i in range(101)])
+        data = np.multiply.outer(np.arange(101), np.linspace(1, 5, 51))
 
         self.ug_masked = gd.UniformGridData(
             self.geom, np.ma.masked_greater(data, 10)
@@ -398,7 +458,7 @@ class TestUniformGridData(unittest.TestCase):
         with self.assertRaises(ValueError):
             gd.UniformGridData(self.geom, np.array([2]))
 
-        data = np.array([i * np.linspace(1, 5, 51) for i in range(101)])
+        data = np.multiply.outer(np.arange(101), np.linspace(1, 5, 51))
 
         ug_data = gd.UniformGridData(self.geom, data)
 
@@ -415,6 +475,28 @@ class TestUniformGridData(unittest.TestCase):
 
         self.assertEqual(ug_data, ug_data_from_grid_structure)
 
+        # Test from_separable
+        with self.assertRaises(TypeError):
+            gd.UniformGridData.from_separable(1, [np.sin])
+
+        # Wrong number of functions
+        with self.assertRaises(ValueError):
+            gd.UniformGridData.from_separable(self.geom, [np.sin])
+
+        x, y = self.geom.coordinates(as_same_shape=True)
+        self.assertEqual(
+            gd.UniformGridData.from_separable(self.geom, [np.sin, np.exp]),
+            gd.UniformGridData(self.geom, np.sin(x) * np.exp(y)),
+        )
+
+        # Functions that return constants
+        self.assertEqual(
+            gd.UniformGridData.from_separable(
+                self.geom, [lambda x: 2, np.cos]
+            ),
+            gd.UniformGridData(self.geom, 2 * np.cos(y)),
+        )
+
         # Test not equal of UniformGridData
         self.assertNotEqual(ug_data, 2)
 
@@ -425,7 +507,7 @@ class TestUniformGridData(unittest.TestCase):
 
     def test_is_complex(self):
 
-        data = np.array([i * np.linspace(1, 5, 51) for i in range(101)])
+        data = np.multiply.outer(np.arange(101), np.linspace(1, 5, 51))
 
         ug_data = gd.UniformGridData(self.geom, data)
 
@@ -437,7 +519,7 @@ class TestUniformGridData(unittest.TestCase):
 
     def test_is_masked(self):
 
-        data = np.array([i * np.linspace(1, 5, 51) for i in range(101)])
+        data = np.multiply.outer(np.arange(101), np.linspace(1, 5, 51))
 
         ug_data = gd.UniformGridData(self.geom, data)
 
@@ -451,7 +533,7 @@ class TestUniformGridData(unittest.TestCase):
         )
 
         # No mask
-        data = np.array([i * np.linspace(1, 5, 51) for i in range(101)])
+        data = np.multiply.outer(np.arange(101), np.linspace(1, 5, 51))
 
         ug_data = gd.UniformGridData(self.geom, data)
 
@@ -461,7 +543,7 @@ class TestUniformGridData(unittest.TestCase):
 
     def test_mask_apply(self):
 
-        data = np.array([i * np.linspace(1, 5, 51) for i in range(101)])
+        data = np.multiply.outer(np.arange(101), np.linspace(1, 5, 51))
 
         data_masked = np.ma.masked_less(data, 3)
 
@@ -488,7 +570,7 @@ class TestUniformGridData(unittest.TestCase):
 
         geom = gd.UniformGrid([101, 1], x0=[0, 0], dx=[0.01, 1])
 
-        data = np.array([i * np.linspace(1, 5, 1) for i in range(101)])
+        data = np.multiply.outer(np.arange(101), np.linspace(1, 5, 1))
         ug_data = gd.UniformGridData(geom, data)
 
         ug_data.flat_dimensions_remove()
@@ -499,9 +581,6 @@ class TestUniformGridData(unittest.TestCase):
             ug_data, gd.UniformGridData(flat_geom, np.linspace(0, 100, 101))
         )
 
-        # Check invalidation of spline
-        self.assertTrue(ug_data.invalid_spline)
-
         # Test from 3D to 2D
         grid_data3d = gdu.sample_function_from_uniformgrid(
             lambda x, y, z: x * (y + 2) * (z + 5),
@@ -542,23 +621,48 @@ class TestUniformGridData(unittest.TestCase):
             np.allclose(-gradient[0].data, original_sin.data, atol=1e-3)
         )
 
+        # Order 0 returns a copy
+        zeroth = original_sin.partial_differentiated(0, order=0)
+        self.assertEqual(zeroth, original_sin)
+        self.assertFalse(np.shares_memory(zeroth.data, original_sin.data))
+
         # Masked data
         with self.assertRaises(RuntimeError):
             self.ug_masked.partial_differentiated(0)
 
+        # Test the compiled kernel (it should be the same as NumPy)
+        data = np.random.default_rng(1).normal(size=(11, 12, 13))
+        data_complex = data + 1j * data[::-1]
+        for axis in range(3):
+            for order in (1, 3):
+                for dat in (data, data_complex):
+                    expected = dat
+                    for _ in range(order):
+                        expected = np.gradient(
+                            expected, 0.1, axis=axis, edge_order=2
+                        )
+                    self.assertTrue(
+                        np.allclose(
+                            gd._partial_derivative(
+                                dat, 0.1, axis, order=order, force_numba=True
+                            ),
+                            expected,
+                        )
+                    )
+
     def test_ghost_zones_remove(self):
 
         geom = gd.UniformGrid(
             [101, 201], x0=[0, 0], x1=[100, 200], num_ghost=[1, 3]
         )
 
-        data = np.array([i * np.linspace(0, 200, 201) for i in range(101)])
+        data = np.multiply.outer(np.arange(101), np.linspace(0, 200, 201))
         ug_data = gd.UniformGridData(geom, data)
 
         ug_data.ghost_zones_remove()
 
-        expected_data = np.array(
-            [i * np.linspace(3, 197, 195) for i in range(1, 100)]
+        expected_data = np.multiply.outer(
+            np.arange(1, 100), np.linspace(3, 197, 195)
         )
         expected_grid = gd.UniformGrid(
             [99, 195], x0=[1, 3], x1=[99, 197], num_ghost=[0, 0]
@@ -567,14 +671,36 @@ class TestUniformGridData(unittest.TestCase):
 
         self.assertEqual(ug_data, expected_ug_data)
 
-        # Check invalidation of spline
-        self.assertTrue(ug_data.invalid_spline)
-
         self.assertCountEqual(ug_data.num_ghost, [0, 0])
 
         # Check with num_ghost = 0
+        data_no_ghosts = ug_data.data
         ug_data.ghost_zones_remove()
         self.assertEqual(ug_data, ug_data.copy())
+        # Nothing was copied
+        self.assertIs(ug_data.data, data_no_ghosts)
+        # ghost_zones_removed always returns a new object
+        self.assertFalse(
+            np.shares_memory(ug_data.ghost_zones_removed().data, ug_data.data)
+        )
+
+        # Check with ghost zones only along some dimensions
+        geom2 = gd.UniformGrid(
+            [101, 201], x0=[0, 0], x1=[100, 200], num_ghost=[3, 0]
+        )
+        ug_data2 = gd.UniformGridData(geom2, data)
+
+        expected_data2 = np.multiply.outer(
+            np.arange(3, 98), np.linspace(0, 200, 201)
+        )
+        expected_grid2 = gd.UniformGrid(
+            [95, 201], x0=[3, 0], x1=[97, 200], num_ghost=[0, 0]
+        )
+
+        self.assertEqual(
+            ug_data2.ghost_zones_removed(),
+            gd.UniformGridData(expected_grid2, expected_data2),
+        )
 
     def test_reflection_symmetry_undo(self):
 
@@ -668,13 +794,19 @@ class TestUniformGridData(unittest.TestCase):
         expected_data = np.array([[7, 8], [3, 4], [3, 4], [7, 8]])
         expected_g_no_zero = gd.UniformGridData(expected_grid, expected_data)
 
+        # Test that the original data is not modified
+        self.assertEqual(
+            expected_g_no_zero, g_no_zero.reflection_symmetry_undone(0)
+        )
+        self.assertCountEqual(g_no_zero.x0, [-3, 1])
+
         g_no_zero.reflection_symmetry_undo(0)
 
         self.assertEqual(expected_g_no_zero, g_no_zero)
 
     def test__apply_reduction(self):
 
-        data = np.array([i * np.linspace(1, 5, 51) for i in range(101)])
+        data = np.multiply.outer(np.arange(101), np.linspace(1, 5, 51))
 
         ug_data = gd.UniformGridData(self.geom, data)
 
@@ -683,8 +815,8 @@ class TestUniformGridData(unittest.TestCase):
 
     def test__apply_binary(self):
 
-        data1 = np.array([i * np.linspace(1, 5, 51) for i in range(101)])
-        data2 = np.array([i ** 2 * np.linspace(1, 5, 51) for i in range(101)])
+        data1 = np.multiply.outer(np.arange(101), np.linspace(1, 5, 51))
+        data2 = np.multiply.outer(np.arange(101) ** 2, np.linspace(1, 5, 51))
         ug_data1 = gd.UniformGridData(self.geom, data1)
         ug_data2 = gd.UniformGridData(self.geom, data2)
 
@@ -696,25 +828,86 @@ class TestUniformGridData(unittest.TestCase):
 
         geom = gd.UniformGrid([101, 1], x0=[0, 0], dx=[1, 1])
 
-        data3 = np.array([i * np.linspace(1, 5, 1) for i in range(101)])
+        data3 = np.multiply.outer(np.arange(101), np.linspace(1, 5, 1))
 
         ug_data3 = gd.UniformGridData(geom, data3)
 
         with self.assertRaises(ValueError):
             ug_data1 + ug_data3
 
+        # Test grids that are the same up to numerical precision but have
+        # different metadata
+        geom_close = gd.UniformGrid(
+            self.geom.shape,
+            x0=self.geom.x0 + 1e-16,
+            dx=self.geom.dx,
+            ref_level=2,
+        )
+        self.assertNotEqual(geom_close._key, self.geom._key)
+        ug_data_close = gd.UniformGridData(geom_close, data2)
+
+        self.assertTrue(
+            np.array_equal(
+                (ug_data1 + ug_data_close).data, expected_ug_data.data
+            )
+        )
+
         # Add number
         self.assertEqual(
             ug_data1 + 1, gd.UniformGridData(self.geom, data1 + 1)
         )
 
+        # Test that the result does not share memory with the inputs
+        self.assertFalse(np.shares_memory((ug_data1 + 0).data, data1))
+        self.assertFalse(np.shares_memory(ug_data1.real().data, ug_data1.data))
+
+        # Ufuncs on masked arrays can reuse the mask of the input
+        ug_masked = ug_data1.masked_greater(data1.mean())
+        negative = -ug_masked
+        negative.data.mask[0, 0] = not ug_masked.data.mask[0, 0]
+        self.assertNotEqual(negative.mask[0, 0], ug_masked.mask[0, 0])
+
+        # Test in-place operations
+        ug_data4 = ug_data1.copy()
+        ug_data4_id = id(ug_data4)
+        # Compute the maximum, to check that it is updated later
+        self.assertEqual(ug_data4.max(), data1.max())
+        ug_data4 += ug_data2
+        ug_data4 -= 1
+        ug_data4 *= 2
+        ug_data4 /= 4
+        self.assertEqual(id(ug_data4), ug_data4_id)
+        self.assertEqual(
+            ug_data4,
+            gd.UniformGridData(self.geom, (data1 + data2 - 1) * 2 / 4),
+        )
+        self.assertEqual(ug_data4.max(), ((data1 + data2 - 1) / 2).max())
+
+        with self.assertRaises(ValueError):
+            ug_data4 /= 0
+
+        with self.assertRaises(ValueError):
+            ug_data4 += ug_data3
+
+        # When the type changes, a new object is returned
+        ones = np.ones(self.geom.shape, dtype=int)
+        ug_data_int = gd.UniformGridData(self.geom, ones)
+        ug_data_int2 = ug_data_int
+        ug_data_int /= 2
+        self.assertEqual(
+            ug_data_int, gd.UniformGridData(self.geom, 0.5 * ones)
+        )
+        self.assertTrue(np.array_equal(ug_data_int2.data, ones))
+        ug_data_int2 *= 1j
+        self.assertTrue(ug_data_int2.is_complex())
+
         # Incompatible objects
         with self.assertRaises(TypeError):
             ug_data1 + geom
 
     def test__apply_unary(self):
 
-        data1 = np.array([i * np.linspace(1, 5, 51) for i in range(101)])
+        data1 = np.multiply.outer(np.arange(101), np.linspace(1, 5, 51))
         ug_data1 = gd.UniformGridData(self.geom, data1)
 
         self.assertEqual(
@@ -856,9 +1049,9 @@ class TestUniformGridData(unittest.TestCase):
         with self.assertRaises(ValueError):
             sin_data.evaluate_with_spline(1, ext=3)
 
-        # Test k!=0!=1
+        # Test points with wrong dimensions
         with self.assertRaises(ValueError):
-            sin_data._make_spline(k=3)
+            sin_data.evaluate_with_spline([[1, 2]])
 
         self.assertAlmostEqual(
             sin_data_complex.evaluate_with_spline([np.pi / 3]),
@@ -884,6 +1077,11 @@ class TestUniformGridData(unittest.TestCase):
             (1 + 1j),
         )
 
+        # Test that computing the spline does not change the coordinates
+        self.assertEqual(
+            len(sin_data_complex_plus_one.coordinates_from_grid()[0]), 12000
+        )
+
         # Test __call__
         self.assertAlmostEqual(
             sin_data_complex([np.pi / 3]),
@@ -974,9 +1172,6 @@ class TestUniformGridData(unittest.TestCase):
             prod_data_complex.evaluate_with_spline((20, 20), ext=1), 0
         )
 
-        self.assertTrue(prod_data_complex.spline_real.bounds_error)
-        self.assertTrue(prod_data_complex.spline_imag.bounds_error)
-
         # Test on a UniformGrid
         sin_data = gdu.sample_function(np.sin, 12000, 0, 2 * np.pi)
         linspace = gd.UniformGrid(101, x0=0, x1=3)
@@ -1030,7 +1225,7 @@ class TestUniformGridData(unittest.TestCase):
         )
 
         with self.assertRaises(RuntimeError):
-            two_points._make_spline()
+            two_points.evaluate_with_spline([[0.25, 0.25]])
 
     def test_copy(self):
 
@@ -1040,7 +1235,8 @@ class TestUniformGridData(unittest.TestCase):
 
         self.assertEqual(sin_data, sin_data2)
         self.assertIsNot(sin_data.data, sin_data2.data)
-        self.assertIsNot(sin_data.grid, sin_data2.grid)
+        # UniformGrid is immutable, so the grid is shared
+        self.assertEqual(sin_data.grid, sin_data2.grid)
 
     def test_histogram(self):
 
@@ -1101,7 +1297,7 @@ class TestUniformGridData(unittest.TestCase):
 
     def test_mean_integral_norm1_norm2(self):
 
-        data = np.array([i ** 2 * np.linspace(1, 5, 51) for i in range(101)])
+        data = np.multiply.outer(np.arange(101) ** 2, np.linspace(1, 5, 51))
         ug_data = gd.UniformGridData(self.geom, data)
 
         self.assertAlmostEqual(ug_data.integral(), np.sum(data) * self.geom.dv)
@@ -1118,6 +1314,72 @@ class TestUniformGridData(unittest.TestCase):
         )
         self.assertAlmostEqual(ug_data.average(), np.mean(data))
 
+        norms = ug_data.norms(orders=(1, 2, 3))
+        self.assertCountEqual(norms.keys(), [1, 2, 3])
+        self.assertAlmostEqual(norms[1], ug_data.norm1())
+        self.assertAlmostEqual(norms[2], ug_data.norm2())
+        self.assertAlmostEqual(norms[3], ug_data.norm_p(3))
+
+        # Infinite norms
+        self.assertEqual(ug_data.norm_p(np.inf), np.max(np.abs(data)))
+        self.assertEqual(ug_data.norm_p(-np.inf), np.min(np.abs(data)))
+        norms = ug_data.norms(orders=(2, np.inf))
+        self.assertAlmostEqual(norms[2], ug_data.norm2())
+        self.assertEqual(norms[np.inf], np.max(np.abs(data)))
+
+        # Complex data
+        ug_data_complex = gd.UniformGridData(self.geom, 1j * data)
+        self.assertAlmostEqual(ug_data_complex.norm2(), ug_data.norm2())
+
+    def test_reductions_follow_data(self):
+
+        data = np.multiply.outer(np.arange(101) - 50, np.linspace(1, 5, 51))
+        ug_data = gd.UniformGridData(self.geom, data)
+
+        self.assertEqual(ug_data.abs_max(), 250)
+        self.assertEqual(ug_data.abs_min(), 0)
+        self.assertEqual(ug_data.abs_nanmax(), 250)
+        self.assertEqual(ug_data.abs_nanmin(), 0)
+
+        self.assertEqual(ug_data.min(), -250)
+        self.assertEqual(ug_data.max(), 250)
+
+        # Test that the values are updated when data is replaced
+        ug_data.data = 2 * data
+        self.assertEqual(ug_data.abs_max(), 500)
+        self.assertEqual(ug_data.min(), -500)
+        self.assertEqual(ug_data.max(), 500)
+
+        # Test that the values are updated when the object is modified
+        # in place
+        ug_data.mask_greater(400)
+        ug_data.mask_less(-400)
+        self.assertLessEqual(ug_data.abs_max(), 400)
+        self.assertLessEqual(ug_data.max(), 400)
+        self.assertGreaterEqual(ug_data.min(), -400)
+
+        # Test that writing directly to the data is taken into account
+        ug_data = gd.UniformGridData(self.geom, data)
+        self.assertEqual(ug_data.max(), 250)
+        self.assertEqual(ug_data.abs_max(), 250)
+        norm1 = ug_data.norm1()
+        ug_data.data[3, 3] = 1000
+        self.assertEqual(ug_data.max(), 1000)
+        self.assertEqual(ug_data.abs_max(), 1000)
+        self.assertGreater(ug_data.norm1(), norm1)
+        ug_data.data *= 10
+        self.assertEqual(ug_data.min(), -2500)
+        self.assertEqual(ug_data.abs_nanmax(), 10000)
+
+        # Test that the interpolation follows the data
+        ug_int = gd.UniformGridData(self.geom, np.ones(self.geom.shape, int))
+        point = self.geom.coordinates_1d[0][1], self.geom.coordinates_1d[1][1]
+        self.assertEqual(ug_int(point), 1)
+        ug_int += 1
+        self.assertEqual(ug_int(point), 2)
+        ug_int.data[1, 1] = 5
+        self.assertEqual(ug_int(point), 5)
+
     def test_resampled(self):
         def product(x, y):
             return x * (y + 2)
@@ -1146,8 +1408,42 @@ class TestUniformGridData(unittest.TestCase):
         self.assertEqual(resampled.grid, new_grid)
         self.assertTrue(np.allclose(resampled.data, exp_resampled.data))
 
-        # Check that the method of the spline is linear
-        self.assertEqual(prod_data_complex.spline_imag.method, "linear")
+        # Check that the result is the same as evaluating the spline on the
+        # points of the new grid
+        self.assertTrue(
+            np.allclose(
+                resampled.data,
+                prod_data_complex(
+                    np.moveaxis(
+                        new_grid.coordinates(as_same_shape=True), 0, -1
+                    )
+                ),
+            )
+        )
+
+        # Test points outside the grid
+        outside_grid = gd.UniformGrid([51, 101], x0=[-1, 2], x1=[2, 3])
+
+        with self.assertRaises(ValueError):
+            prod_data.resampled(outside_grid)
+
+        resampled_outside = prod_data.resampled(outside_grid, ext=1)
+        outside = outside_grid.coordinates(as_same_shape=True)[0] < -0.015
+        self.assertTrue(np.all(resampled_outside.data[outside] == 0))
+        self.assertTrue(
+            np.allclose(
+                resampled_outside.data[~outside],
+                gdu.sample_function_from_uniformgrid(
+                    product, outside_grid
+                ).data[~outside],
+            )
+        )
+
+        # Test masked data
+        with self.assertRaises(RuntimeError):
+            gd.UniformGridData(
+                prod_data.grid, np.ma.masked_greater(prod_data.data, 10)
+            ).resampled(new_grid)
 
         # Test using nearest interpolation
         resampled_nearest = prod_data_complex.resampled(
@@ -1158,9 +1454,6 @@ class TestUniformGridData(unittest.TestCase):
             np.allclose(resampled_nearest.data, exp_resampled.data, atol=1e-3)
         )
 
-        # Check that the method of the spline hasn't linear
-        self.assertEqual(prod_data_complex.spline_imag.method, "linear")
-
         # Check single number
         self.assertAlmostEqual(resampled_nearest((2, 2.5)), 9 * (1 + 1j))
 
@@ -1337,7 +1630,11 @@ class TestUniformGridData(unittest.TestCase):
 
 
 class TestHierarchicalGridData(unittest.TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
+        # The fixtures are the same for all the tests, so we sample them only
+        # once here. setUp gives each test its own copies of the data.
+
         # Here we split the rectangle with x0 = [0, 1], x1 = [14, 26]
         # and shape [14, 26] in 4 pieces
         patch1 = gd.UniformGrid([4, 5], x0=[0, 1], x1=[3, 5], ref_level=0)
@@ -1345,40 +1642,65 @@ class TestHierarchicalGridData(unittest.TestCase):
         patch3 = gd.UniformGrid([11, 5], x0=[4, 1], x1=[14, 5], ref_level=0)
         patch4 = gd.UniformGrid([4, 21], x0=[0, 6], x1=[3, 26], ref_level=0)
 
-        self.grids0 = [patch1, patch2, patch3, patch4]
-        # self.grids1 are not to be merged because they do not fill the space
-        self.grids1 = [patch1, patch2]
+        cls.grids0 = [patch1, patch2, patch3, patch4]
+        # cls.grids1 are not to be merged because they do not fill the space
+        cls.grids1 = [patch1, patch2]
 
         def product(x, y):
             return x * (y + 2)
 
-        self.grid_data = [
+        cls._grid_data = [
             gdu.sample_function_from_uniformgrid(product, g)
-            for g in self.grids0
+            for g in cls.grids0
         ]
 
-        self.grid_data_two_comp = [
+        cls._grid_data_two_comp = [
             gdu.sample_function_from_uniformgrid(product, g)
-            for g in self.grids1
+            for g in cls.grids1
         ]
 
-        self.expected_grid = gd.UniformGrid(
+        cls.expected_grid = gd.UniformGrid(
             [15, 26], x0=[0, 1], x1=[14, 26], ref_level=0
         )
 
-        self.expected_data = gdu.sample_function_from_uniformgrid(
-            product, self.expected_grid
+        cls._expected_data = gdu.sample_function_from_uniformgrid(
+            product, cls.expected_grid
         )
 
         # We also consider one grid data with a different refinement level
-        self.expected_grid_level2 = gd.UniformGrid(
+        cls.expected_grid_level2 = gd.UniformGrid(
             [15, 26], x0=[0, 1], x1=[14, 26], ref_level=2
         )
 
-        self.expected_data_level2 = gdu.sample_function_from_uniformgrid(
-            product, self.expected_grid_level2
+        cls._expected_data_level2 = gdu.sample_function_from_uniformgrid(
+            product, cls.expected_grid_level2
+        )
+
+        # Large sine waves on two refinement levels, for the tests on
+        # derivatives and extrema
+        sin_geom = gd.UniformGrid(
+            [8001, 3], x0=[0, 0], x1=[2 * np.pi, 1], ref_level=0
+        )
+        sin_geom2 = gd.UniformGrid(
+            [10001, 3], x0=[0, 0], x1=[2 * np.pi, 1], ref_level=1
+        )
+
+        cls._sin_wave1 = gdu.sample_function_from_uniformgrid(
+            lambda x, y: np.sin(x), sin_geom
+        )
+        cls._sin_wave2 = gdu.sample_function_from_uniformgrid(
+            lambda x, y: np.sin(x), sin_geom2
         )
 
+    def setUp(self):
+        # Some tests modify the data, so we copy it (grids are immutable)
+        self.grid_data = [data.copy() for data in self._grid_data]
+        self.grid_data_two_comp = [
+            data.copy() for data in self._grid_data_two_comp
+        ]
+        self.expected_data = self._expected_data.copy()
+        self.expected_data_level2 = self._expected_data_level2.copy()
+
     def test_init(self):
 
         # Test incorrect arguments
@@ -1448,6 +1770,36 @@ class TestHierarchicalGridData(unittest.TestCase):
 
         self.assertTrue(isinstance(hg_merged[0][0].data, np.ma.MaskedArray))
 
+        # Test merging components with ghost zones
+        def product(x, y):
+            return x * (y + 2)
+
+        grid_data_ghosts = [
+            gdu.sample_function_from_uniformgrid(
+                product,
+                gd.UniformGrid(
+                    g.shape + 2,
+                    x0=g.x0 - g.dx,
+                    dx=g.dx,
+                    num_ghost=[1, 1],
+                    ref_level=0,
+                ),
+            )
+            for g in self.grids0
+        ]
+        hg_ghosts = gd.HierarchicalGridData(grid_data_ghosts)
+        self.assertEqual(hg_ghosts[0], [self.expected_data])
+
+        # The components do not share memory with the input
+        for hg, inputs in (
+            (one, [prod_data1]),
+            (hg_many_components, self.grid_data),
+            (hg3, self.grid_data_two_comp),
+        ):
+            for comp in hg.all_components:
+                for inp in inputs:
+                    self.assertFalse(np.shares_memory(comp.data, inp.data))
+
     def test_check_ref_factors(self):
 
         # Check a good grid, with refinement factors that are a constant
@@ -1513,11 +1865,11 @@ class TestHierarchicalGridData(unittest.TestCase):
     def test_shape(self):
 
         hg = gd.HierarchicalGridData(self.grid_data)
-        self.assertCountEqual(hg.shape, {0: 1})
+        self.assertEqual(hg.shape, {0: 1})
 
         # Multiple patches will throw an error
         hg3 = gd.HierarchicalGridData(self.grid_data_two_comp)
-        self.assertCountEqual(hg3.shape, {0: 2})
+        self.assertEqual(hg3.shape, {0: 2})
 
     def test_properties(self):
 
@@ -1528,7 +1880,7 @@ class TestHierarchicalGridData(unittest.TestCase):
         self.assertEqual(len(hg), 2)
 
         # refinement levels
-        self.assertCountEqual(hg.refinement_levels, [0, 2])
+        self.assertEqual(hg.refinement_levels, [0, 2])
 
         # grid_data
         self.assertCountEqual(
@@ -1548,11 +1900,11 @@ class TestHierarchicalGridData(unittest.TestCase):
         self.assertEqual(hg.num_coarsest_level, 0)
 
         # dtype
-        self.assertEqual(hg.dtype, np.float)
+        self.assertEqual(hg.dtype, np.float64)
 
         # x0, x1
-        self.assertCountEqual(hg.x0, self.expected_data.x0)
-        self.assertCountEqual(hg.x1, self.expected_data.x1)
+        np.testing.assert_allclose(hg.x0, self.expected_data.x0)
+        np.testing.assert_allclose(hg.x1, self.expected_data.x1)
         # For multiple components there should be an error
         hg3 = gd.HierarchicalGridData(self.grid_data_two_comp)
         with self.assertRaises(ValueError):
@@ -1561,10 +1913,10 @@ class TestHierarchicalGridData(unittest.TestCase):
             hg3.x1
 
         # dx_at_level, dx coarsest, fines
-        self.assertCountEqual(hg.dx_at_level(0), [1, 1])
-        self.assertCountEqual(hg3.dx_at_level(0), [1, 1])
-        self.assertCountEqual(hg.coarsest_dx, [1, 1])
-        self.assertCountEqual(hg.finest_dx, [1, 1])
+        np.testing.assert_allclose(hg.dx_at_level(0), [1, 1])
+        np.testing.assert_allclose(hg3.dx_at_level(0), [1, 1])
+        np.testing.assert_allclose(hg.coarsest_dx, [1, 1])
+        np.testing.assert_allclose(hg.finest_dx, [1, 1])
 
         # num dimensions
         self.assertEqual(hg.num_dimensions, 2)
@@ -1607,6 +1959,13 @@ class TestHierarchicalGridData(unittest.TestCase):
         hg4 = hg3.copy()
         self.assertEqual(hg3, hg4)
 
+        for hg, hg_copy in ((hg1, hg2), (hg3, hg4)):
+            self.assertEqual(hg.refinement_levels, hg_copy.refinement_levels)
+            for comp, comp_copy in zip(
+                hg.all_components, hg_copy.all_components
+            ):
+                self.assertFalse(np.shares_memory(comp.data, comp_copy.data))
+
     def test_is_complex(self):
 
         hg_real = gd.HierarchicalGridData(self.grid_data_two_comp)
@@ -1714,6 +2073,23 @@ class TestHierarchicalGridData(unittest.TestCase):
 
         self.assertAlmostEqual(hg3.min(), 0)
 
+        # The reductions over the components are the same as the reductions
+        # over all the data
+        hg_neg = -hg3
+        all_data = np.concatenate(
+            [comp.data.ravel() for comp in hg_neg.all_components]
+        )
+        self.assertAlmostEqual(hg_neg.min(), np.min(all_data))
+        self.assertAlmostEqual(hg_neg.max(), np.max(all_data))
+        self.assertAlmostEqual(hg_neg.abs_min(), np.min(np.abs(all_data)))
+        self.assertAlmostEqual(hg_neg.abs_max(), np.max(np.abs(all_data)))
+        self.assertAlmostEqual(
+            hg_neg.abs_nanmin(), np.nanmin(np.abs(all_data))
+        )
+        self.assertAlmostEqual(
+            hg_neg.abs_nanmax(), np.nanmax(np.abs(all_data))
+        )
+
     def test__apply_unary(self):
 
         hg1 = gd.HierarchicalGridData(self.grid_data)
@@ -1782,6 +2158,28 @@ class TestHierarchicalGridData(unittest.TestCase):
         self.assertEqual(np.amax(np.abs(zero2[0][0].data)), 0)
         self.assertEqual(np.amax(np.abs(zero2[0][1].data)), 0)
 
+        # The result has the same structure and does not share memory with
+        # the operands
+        double = hg3 + hg3
+        self.assertEqual(
+            double,
+            gd.HierarchicalGridData(
+                [2 * comp for comp in self.grid_data_two_comp]
+            ),
+        )
+        self.assertEqual(double.refinement_levels, hg3.refinement_levels)
+        self.assertEqual(len(double[0]), 2)
+        for comp, comp_double in zip(
+            hg3.all_components, double.all_components
+        ):
+            self.assertFalse(np.shares_memory(comp.data, comp_double.data))
+
+        # The real part of real data is a view, so it has to be copied
+        real = hg3.real()
+        self.assertEqual(real, hg3)
+        for comp, comp_real in zip(hg3.all_components, real.all_components):
+            self.assertFalse(np.shares_memory(comp.data, comp_real.data))
+
     def test_finest_component_at_point(self):
 
         # Using the component mapping
@@ -1811,6 +2209,22 @@ class TestHierarchicalGridData(unittest.TestCase):
         self.assertEqual(hg3.finest_component_at_point([3, 5]), hg3[0][0])
         self.assertEqual(hg3.finest_component_at_point([4, 6]), hg3[0][1])
 
+        # Multiple points at once with the component mapping
+        components, indices = hg3._finest_components_at_points(
+            np.array([[3, 4], [4, 6], [3, 5]])
+        )
+        self.assertIs(components[indices[0]], hg3[0][0])
+        self.assertIs(components[indices[1]], hg3[0][1])
+        self.assertIs(components[indices[2]], hg3[0][0])
+
+        points = [[3, 4], [4, 6], [3, 5], [10, 20]]
+        self.assertTrue(
+            np.allclose(hg3(points), [hg3(point) for point in points])
+        )
+
+        with self.assertRaises(ValueError):
+            hg3._finest_components_at_points(np.array([[3, 4], [1000, 200]]))
+
         # Using the general method. The general method kicks in when the
         # refinement levels do not have integral refinement factors
         data = gdu.sample_function(
@@ -1842,6 +2256,32 @@ class TestHierarchicalGridData(unittest.TestCase):
             hg_general.finest_component_at_point([3, 4]), hg_general[0][0]
         )
 
+        # The mapping is not available, and we remember that
+        self.assertFalse(hg_general._has_component_mapping())
+        self.assertIs(hg_general._component_mapping, False)
+        self.assertTrue(hg3._has_component_mapping())
+
+        # Multiple points at once
+        components = hg_general._components_bounds[0]
+        indices = hg_general._finest_components_indices_at_points(
+            [[2, 4], [3, 4], [2, 4]]
+        )
+        self.assertIs(components[indices[0]], hg_general[1][0])
+        self.assertIs(components[indices[1]], hg_general[0][0])
+        self.assertEqual(indices[0], indices[2])
+
+        # Evaluating on multiple points is the same as evaluating on each
+        points = [[2, 4], [3, 4], [1, 2], [2.5, 3]]
+        self.assertTrue(
+            np.allclose(
+                hg_general(points), [hg_general(point) for point in points]
+            )
+        )
+
+        # Point outside the grid
+        with self.assertRaises(ValueError):
+            hg_general([[2, 4], [1000, 200]])
+
     def test_call_evalute_with_spline(self):
 
         # Teting call is the same as evalute_with_spline
@@ -1862,8 +2302,8 @@ class TestHierarchicalGridData(unittest.TestCase):
         self.assertAlmostEqual(hg3([(2, 3)]), 10)
 
         # Vector input
-        self.assertCountEqual(hg([(2, 3), (3, 2)]), [10, 12])
-        self.assertCountEqual(hg3([(2, 3), (3, 2)]), [10, 12])
+        np.testing.assert_allclose(hg([(2, 3), (3, 2)]), [10, 12])
+        np.testing.assert_allclose(hg3([(2, 3), (3, 2)]), [10, 12])
 
         def product(x, y):
             return x * (y + 2)
@@ -1976,34 +2416,8 @@ class TestHierarchicalGridData(unittest.TestCase):
     def test_partial_differentiated(self):
         # Here we are also testing _call_component_method
 
-        geom = gd.UniformGrid(
-            [8001, 3], x0=[0, 0], x1=[2 * np.pi, 1], ref_level=0
-        )
-        geom2 = gd.UniformGrid(
-            [10001, 3], x0=[0, 0], x1=[2 * np.pi, 1], ref_level=1
-        )
-
-        sin_wave1 = gdu.sample_function_from_uniformgrid(
-            lambda x, y: np.sin(x), geom
-        )
-        sin_wave2 = gdu.sample_function_from_uniformgrid(
-            lambda x, y: np.sin(x), geom2
-        )
-        original_sin1 = sin_wave1.copy()
-        original_sin2 = sin_wave2.copy()
-
-        sin_wave = gd.HierarchicalGridData([sin_wave1] + [sin_wave2])
-        sin_copy = sin_wave.copy()
-
-        # Second derivative should still be a -sin
-        sin_wave.partial_differentiate(0, order=2)
-
-        self.assertTrue(
-            np.allclose(-sin_wave[0][0].data, original_sin1.data, atol=1e-3)
-        )
-        self.assertTrue(
-            np.allclose(-sin_wave[1][0].data, original_sin2.data, atol=1e-3)
-        )
+        # The sine waves are only read here, so we do not copy them
+        sin_wave = gd.HierarchicalGridData([self._sin_wave1, self._sin_wave2])
 
         # Test _call_component_method with non-string name
         with self.assertRaises(TypeError):
@@ -2013,17 +2427,38 @@ class TestHierarchicalGridData(unittest.TestCase):
         with self.assertRaises(ValueError):
             sin_wave._call_component_method("lol")
 
-        gradient = sin_copy.gradient(order=2)
-        # Along the first direction (it's a HierarchicalGridData)
-        partial_x = gradient[0]
-
-        self.assertTrue(
-            np.allclose(-partial_x[0][0].data, original_sin1.data, atol=1e-3)
-        )
-        # First refinement_level
-        self.assertTrue(
-            np.allclose(-partial_x[1][0].data, original_sin2.data, atol=1e-3)
-        )
+        # Second derivative should still be a -sin. gradient returns a list
+        # with one HierarchicalGridData per direction, we take the first.
+        derivatives = {
+            "partial_differentiated": sin_wave.partial_differentiated(
+                0, order=2
+            ),
+            "gradient": sin_wave.gradient(order=2)[0],
+        }
+
+        for name, derivative in derivatives.items():
+            with self.subTest(method=name):
+                # Coarsest refinement level
+                self.assertTrue(
+                    np.allclose(
+                        -derivative[0][0].data,
+                        self._sin_wave1.data,
+                        atol=1e-3,
+                    )
+                )
+                # First refinement level
+                self.assertTrue(
+                    np.allclose(
+                        -derivative[1][0].data,
+                        self._sin_wave2.data,
+                        atol=1e-3,
+                    )
+                )
+
+        # The in-place version modifies only its own copy
+        sin_copy = sin_wave.copy()
+        sin_copy.partial_differentiate(0, order=2)
+        self.assertEqual(sin_copy, derivatives["partial_differentiated"])
 
     def test_slice(self):
 
@@ -2054,22 +2489,7 @@ class TestHierarchicalGridData(unittest.TestCase):
 
         # Here we are also testing _call_component_method
 
-        geom = gd.UniformGrid(
-            [8001, 3], x0=[0, 0], x1=[2 * np.pi, 1], ref_level=0
-        )
-        geom2 = gd.UniformGrid(
-            [10001, 3], x0=[0, 0], x1=[2 * np.pi, 1], ref_level=1
-        )
-
-        sin_wave1 = gdu.sample_function_from_uniformgrid(
-            lambda x, y: np.sin(x), geom
-        )
-
-        sin_wave2 = gdu.sample_function_from_uniformgrid(
-            lambda x, y: np.sin(x), geom2
-        )
-
-        sin_wave = gd.HierarchicalGridData([sin_wave1] + [sin_wave2])
+        sin_wave = gd.HierarchicalGridData([self._sin_wave1, self._sin_wave2])
 
         # We are taking the abs
         self.assertEqual(sin_wave.coordinates_at_minimum()[0], 0)
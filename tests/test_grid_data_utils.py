@@ -141,12 +141,44 @@ class TestGridDataUtils(unittest.TestCase):
         with self.assertRaises(TypeError):
             gdu.sample_function_from_uniformgrid(square, geom)
 
-        # Test other TypeError
+        # Test ufunc that takes too few arguments
         with self.assertRaises(TypeError):
             gdu.sample_function_from_uniformgrid(np.sin, geom2d)
 
+        # Test ufunc that takes too many arguments
+        with self.assertRaises(TypeError):
+            gdu.sample_function_from_uniformgrid(np.add, geom)
+
+        # Test functions with default or variable arguments
+        self.assertEqual(
+            gdu.sample_function_from_uniformgrid(
+                lambda x, y, z=1: x * y * z, geom2d
+            ),
+            gdu.sample_function_from_uniformgrid(np.multiply, geom2d),
+        )
+        self.assertEqual(
+            gdu.sample_function_from_uniformgrid(
+                lambda *args: args[0] * args[1], geom2d
+            ),
+            gdu.sample_function_from_uniformgrid(np.multiply, geom2d),
+        )
+
         data2d = np.vectorize(square)(*geom2d.coordinates(as_same_shape=True))
 
+        # Functions that work with arrays are called only once, with the
+        # sparse coordinates, and not once per point
+        calls = []
+
+        def square_counted(x, y):
+            calls.append((np.shape(x), np.shape(y)))
+            return x * y
+
+        self.assertEqual(
+            gdu.sample_function_from_uniformgrid(square_counted, geom2d),
+            gd.UniformGridData(geom2d, data2d),
+        )
+        self.assertEqual(calls, [((100, 1), (1, 200))])
+
         self.assertEqual(
             gdu.sample_function(square, [100, 200], [0, 1], [1, 2]),
             gd.UniformGridData(geom2d, data2d),
@@ -156,3 +188,79 @@ class TestGridDataUtils(unittest.TestCase):
             gdu.sample_function_from_uniformgrid(square, geom2d),
             gd.UniformGridData(geom2d, data2d),
         )
+
+        # Test functions that cannot be evaluated on arrays
+        def square_positive(x, y):
+            if x * y > 0.5:
+                return x * y
+            return 0.0
+
+        data2d_positive = np.where(data2d > 0.5, data2d, 0)
+
+        self.assertEqual(
+            gdu.sample_function_from_uniformgrid(square_positive, geom2d),
+            gd.UniformGridData(geom2d, data2d_positive),
+        )
+
+        # Same, but compiling the function (when numba is available)
+        sparse_coordinates = geom2d.coordinates(
+            as_same_shape=True, sparse=True
+        )
+        self.assertTrue(
+            np.allclose(
+                gdu._evaluate_pointwise(
+                    square_positive, sparse_coordinates, force_numba=True
+                ),
+                data2d_positive,
+            )
+        )
+
+        # Functions that cannot be compiled are evaluated anyway
+        thresholds = {"threshold": 0.5}
+
+        def square_positive_dict(x, y):
+            if x * y > thresholds["threshold"]:
+                return x * y
+            return 0.0
+
+        self.assertTrue(
+            np.allclose(
+                gdu._evaluate_pointwise(
+                    square_positive_dict, sparse_coordinates, force_numba=True
+                ),
+                data2d_positive,
+            )
+        )
+
+        # Test functions that do not depend on all the coordinates
+        data2d_x = geom2d.coordinates(as_same_shape=True)[0]
+
+        self.assertEqual(
+            gdu.sample_function_from_uniformgrid(lambda x, y: x, geom2d),
+            gd.UniformGridData(geom2d, data2d_x),
+        )
+
+        # Test constant functions
+        self.assertEqual(
+            gdu.sample_function_from_uniformgrid(lambda x, y: 2, geom2d),
+            gd.UniformGridData(geom2d, 2 * np.ones(geom2d.shape)),
+        )
+
+        # Test separable functions
+        self.assertEqual(
+            gdu.sample_function_from_uniformgrid(
+                [lambda x: x, lambda y: y], geom2d, separable=True
+            ),
+            gd.UniformGridData(geom2d, data2d),
+        )
+
+        self.assertEqual(
+            gdu.sample_function(
+                [np.sin, np.cos], [100, 200], [0, 1], [1, 2], separable=True
+            ),
+            gd.UniformGridData(
+                geom2d,
+                np.sin(data2d_x)
+                * np.cos(geom2d.coordinates(as_same_shape=True)[1]),
+            ),
+        )